@@ -4,10 +4,43 @@ Este módulo define las estructuras de datos y configuraciones del sistema
 de cartelería digital utilizando Pydantic para validación robusta.
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, validator
+from typing import List, Optional, Dict, Any, FrozenSet, Iterable, Iterator, Pattern, Tuple, Union
 from pathlib import Path
 import os
+import re
+
+from logger import logger
+
+
+def compile_formats_pattern(supported_formats: Iterable[str]) -> Pattern[str]:
+    """Compila las extensiones soportadas en una única expresión regular.
+    
+    La expresión reconoce el sufijo de un nombre de archivo sin distinguir
+    mayúsculas, evitando splitext, lower y la búsqueda en un conjunto por
+    cada entrada del directorio.
+    
+    Args:
+        supported_formats: Extensiones soportadas (con punto)
+        
+    Returns:
+        Patrón que encuentra la extensión soportada al final del nombre (o
+        de la ruta) y la expone en el grupo ``ext``
+    """
+    alternatives = '|'.join(
+        sorted({re.escape(fmt.lstrip('.')) for fmt in supported_formats})
+    )
+    if not alternatives:
+        # Patrón que nunca coincide
+        return re.compile(r'(?!)')
+    # Igual que os.path.splitext, el nombre necesita algo más que puntos
+    # antes de la extensión, así que '.mp4' es un archivo oculto y no un
+    # video. \Z en lugar de $: $ también coincide antes de un salto de línea
+    return re.compile(
+        rf'(?:\A|/)\.*[^./][^/]*(?P<ext>\.(?:{alternatives}))\Z',
+        re.IGNORECASE
+    )
 
 
 class SystemConfig(BaseModel):
@@ -17,6 +50,8 @@ class SystemConfig(BaseModel):
     modelos pydantic para validación robusta.
     """
     
+    model_config = ConfigDict(revalidate_instances='never', validate_assignment=False)
+    
     video_dir: Path = Field(
         default=Path('/home/pi/kdx-pi-signage/videos'),
         description="Directorio donde se almacenan los videos"
@@ -25,8 +60,8 @@ class SystemConfig(BaseModel):
         default=Path('/home/pi/kdx-pi-signage/logs'),
         description="Directorio para archivos de log"
     )
-    supported_formats: List[str] = Field(
-        default=['.mp4', '.avi', '.mkv', '.mov', '.wmv'],
+    supported_formats: Tuple[str, ...] = Field(
+        default=('.mp4', '.avi', '.mkv', '.mov', '.wmv'),
         description="Formatos de video soportados"
     )
     refresh_interval: int = Field(
@@ -47,6 +82,63 @@ class SystemConfig(BaseModel):
         le=60,
         description="Delay entre reintentos en segundos"
     )
+    parallel_scan: bool = Field(
+        default=False,
+        description="Consultar metadatos de videos en paralelo (útil en SMB/NFS)"
+    )
+    polling_observer: bool = Field(
+        default=False,
+        description="Vigilar el directorio por sondeo en lugar de inotify (SMB/NFS/FUSE)"
+    )
+    polling_interval: int = Field(
+        default=30,
+        ge=1,
+        le=300,
+        description="Intervalo de sondeo del directorio en segundos"
+    )
+    
+    _supported_formats_set: FrozenSet[str] = PrivateAttr(default=frozenset())
+    _supported_formats_pattern: Pattern[str] = PrivateAttr(
+        default=compile_formats_pattern(())
+    )
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Precalcula el conjunto y el patrón de formatos soportados."""
+        self._update_formats_cache()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Asigna un campo y recalcula los formatos precalculados si cambian."""
+        super().__setattr__(name, value)
+        if name == 'supported_formats':
+            self._update_formats_cache()
+    
+    def _update_formats_cache(self) -> None:
+        """Recalcula el conjunto y el patrón a partir de supported_formats."""
+        self._supported_formats_set = frozenset(
+            fmt.lower() for fmt in self.supported_formats
+        )
+        self._supported_formats_pattern = compile_formats_pattern(self.supported_formats)
+    
+    @property
+    def supported_formats_set(self) -> FrozenSet[str]:
+        """Formatos soportados como frozenset para comprobar extensiones.
+        
+        Las extensiones se normalizan a minúsculas, por lo que basta con
+        comparar contra ``os.path.splitext(nombre)[1].lower()``.
+        
+        Returns:
+            Conjunto inmutable de extensiones soportadas en minúsculas
+        """
+        return self._supported_formats_set
+    
+    @property
+    def supported_formats_pattern(self) -> Pattern[str]:
+        """Formatos soportados como expresión regular precompilada.
+        
+        Returns:
+            Patrón que encuentra la extensión soportada al final de un nombre
+        """
+        return self._supported_formats_pattern
     
     @validator('video_dir', 'log_dir')
     def validate_directories(cls, v):
@@ -69,9 +161,16 @@ class VLCConfig(BaseModel):
     """Configuración de VLC optimizada para cartelería digital.
     
     Esta clase define las opciones de VLC con validación pydantic
-    para garantizar configuraciones correctas del reproductor.
+    para garantizar configuraciones correctas del reproductor. Es inmutable,
+    por lo que los argumentos de VLC se calculan una única vez.
     """
     
+    model_config = ConfigDict(
+        frozen=True,
+        revalidate_instances='never',
+        validate_assignment=False
+    )
+    
     interface: str = Field(
         default='dummy',
         description="Interfaz de VLC (dummy para modo headless)"
@@ -109,9 +208,26 @@ class VLCConfig(BaseModel):
         description="Códec de hardware OMX/MMAL"
     )
     
+    _vlc_args: Tuple[str, ...] = PrivateAttr(default=())
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Precalcula los argumentos de VLC una única vez."""
+        self._vlc_args = tuple(self._build_vlc_args())
+    
     def to_vlc_args(self) -> List[str]:
         """Convertir configuración a argumentos de VLC.
         
+        Los argumentos se precalculan al crear la configuración, que es
+        inmutable; cada llamada devuelve una copia.
+        
+        Returns:
+            Lista de argumentos para VLC
+        """
+        return list(self._vlc_args)
+    
+    def _build_vlc_args(self) -> List[str]:
+        """Construye los argumentos de VLC a partir de los campos.
+        
         Returns:
             Lista de argumentos para VLC
         """
@@ -141,9 +257,12 @@ class PlayerState(BaseModel):
     """Estado actual del reproductor de video.
     
     Esta clase mantiene el estado del reproductor y la playlist
-    con validación de datos.
+    con validación de datos. La existencia de ``current_video`` no se
+    comprueba aquí: se verifica al abrir el archivo en el reproductor.
     """
     
+    model_config = ConfigDict(validate_assignment=False)
+    
     current_video: Optional[str] = Field(
         default=None,
         description="Ruta del video actualmente en reproducción"
@@ -171,23 +290,19 @@ class PlayerState(BaseModel):
         default=None,
         description="Timestamp del último escaneo de videos"
     )
-    
-    @validator('current_video')
-    def validate_video_path(cls, v):
-        """Valida que el archivo de video exista si se especifica."""
-        if v is not None and not Path(v).exists():
-            raise ValueError(f"Archivo de video no encontrado: {v}")
-        return v
 
 
 class VideoInfo(BaseModel):
     """Información detallada de un archivo de video.
     
     Esta clase encapsula los metadatos de un archivo de video
-    con validación de existencia y formato.
+    con validación de existencia y formato. Es inmutable: las instancias
+    se comparten entre la playlist y el escáner sin copiarse.
     """
     
-    file_path: Path = Field(description="Ruta completa del archivo")
+    model_config = ConfigDict(frozen=True)
+    
+    file_path: str = Field(description="Ruta completa del archivo")
     filename: str = Field(description="Nombre del archivo")
     file_size: int = Field(ge=0, description="Tamaño del archivo en bytes")
     format_extension: str = Field(description="Extensión del formato")
@@ -197,57 +312,115 @@ class VideoInfo(BaseModel):
         description="Timestamp de última modificación"
     )
     
-    @validator('file_path')
-    def validate_file_exists(cls, v):
-        """Valida que el archivo exista."""
-        if isinstance(v, str):
-            v = Path(v)
-        if not v.exists():
-            raise ValueError(f"Archivo no encontrado: {v}")
+    @classmethod
+    def from_path(cls, file_path: Union[str, os.PathLike]) -> 'VideoInfo':
+        """Construye un VideoInfo a partir de una única llamada a stat.
+        
+        Args:
+            file_path: Ruta completa del archivo de video
+            
+        Returns:
+            VideoInfo con tamaño y fecha de modificación ya resueltos
+            
+        Raises:
+            ValueError: Si el archivo no existe
+        """
+        file_path = os.fspath(file_path)
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError as e:
+            raise ValueError(f"Archivo no encontrado: {file_path}") from e
+        
+        return cls.fast_build(file_path, st)
+    
+    @classmethod
+    def from_dirent(cls, entry: os.DirEntry, format_extension: Optional[str] = None) -> 'VideoInfo':
+        """Construye un VideoInfo a partir de una entrada de os.scandir.
+        
+        Reutiliza el stat cacheado por la entrada en lugar de consultar
+        de nuevo el sistema de archivos.
+        
+        Args:
+            entry: Entrada de directorio obtenida con os.scandir
+            format_extension: Extensión ya calculada (en minúsculas), si se conoce
+            
+        Returns:
+            VideoInfo con los metadatos de la entrada
+        """
+        return cls.fast_build(entry.path, entry.stat(), entry.name, format_extension)
+    
+    @classmethod
+    def fast_build(
+        cls,
+        file_path: str,
+        st: os.stat_result,
+        filename: Optional[str] = None,
+        format_extension: Optional[str] = None
+    ) -> 'VideoInfo':
+        """Construye un VideoInfo sin validación a partir de un stat ya hecho.
+        
+        Los datos provienen del sistema de archivos y ya son confiables,
+        por lo que se omite la validación de Pydantic (model_construct).
+        
+        Args:
+            file_path: Ruta completa del archivo de video
+            st: Resultado de stat del archivo
+            filename: Nombre del archivo, si ya se conoce
+            format_extension: Extensión en minúsculas, si ya se conoce
+            
+        Returns:
+            VideoInfo construido directamente con los valores del stat
+        """
+        if filename is None:
+            filename = os.path.basename(file_path)
+        if format_extension is None:
+            format_extension = os.path.splitext(filename)[1].lower()
+        
+        return cls.model_construct(
+            file_path=file_path,
+            filename=filename,
+            file_size=st.st_size,
+            format_extension=format_extension,
+            is_valid=True,
+            last_modified=st.st_mtime
+        )
+    
+    @validator('file_path', pre=True)
+    def normalize_file_path(cls, v):
+        """Acepta rutas Path y las guarda como str.
+        
+        La existencia del archivo no se verifica aquí: quien construye el
+        VideoInfo (escáner o from_path) ya ha hecho stat sobre el archivo.
+        """
+        if isinstance(v, os.PathLike):
+            return os.fspath(v)
         return v
     
     @validator('filename', pre=True, always=True)
     def extract_filename(cls, v, values):
         """Extrae el nombre del archivo de la ruta."""
         if 'file_path' in values and values['file_path']:
-            return values['file_path'].name
+            return os.path.basename(values['file_path'])
         return v
     
     @validator('format_extension', pre=True, always=True)
     def extract_extension(cls, v, values):
         """Extrae la extensión del archivo."""
         if 'file_path' in values and values['file_path']:
-            return values['file_path'].suffix.lower()
+            return os.path.splitext(values['file_path'])[1].lower()
         return v.lower() if v else ''
-    
-    @validator('file_size', pre=True, always=True)
-    def get_file_size(cls, v, values):
-        """Obtiene el tamaño del archivo."""
-        if 'file_path' in values and values['file_path']:
-            try:
-                return values['file_path'].stat().st_size
-            except OSError:
-                return 0
-        return v
-    
-    @validator('last_modified', pre=True, always=True)
-    def get_last_modified(cls, v, values):
-        """Obtiene el timestamp de última modificación."""
-        if 'file_path' in values and values['file_path']:
-            try:
-                return values['file_path'].stat().st_mtime
-            except OSError:
-                return None
-        return v
 
 
 class Playlist(BaseModel):
     """Lista de reproducción de videos con metadatos.
     
     Esta clase gestiona la lista de reproducción con validación
-    y métodos para navegación.
+    y métodos para navegación. Los VideoInfo recibidos se guardan tal cual,
+    sin revalidarse ni copiarse.
     """
     
+    model_config = ConfigDict(revalidate_instances='never', validate_assignment=False)
+    
     videos: List[VideoInfo] = Field(
         default_factory=list,
         description="Lista de videos en la playlist"
@@ -290,15 +463,18 @@ class Playlist(BaseModel):
         Returns:
             VideoInfo del siguiente video o None si no hay más videos
         """
-        if not self.videos:
+        videos = self.videos
+        if not videos:
             return None
         
-        next_index = (self.current_index + 1) % len(self.videos)
-        if next_index == 0 and not self.loop_enabled:
-            return None
+        next_index = self.current_index + 1
+        if next_index >= len(videos):
+            if not self.loop_enabled:
+                return None
+            next_index = 0
         
         self.current_index = next_index
-        return self.videos[self.current_index]
+        return videos[next_index]
     
     def reset_playlist(self) -> None:
         """Reinicia la playlist al primer video."""
@@ -313,6 +489,74 @@ class Playlist(BaseModel):
         return len(self.videos) == 0
 
 
+# Hilos usados para consultar metadatos en paralelo en scan_video_dir
+SCAN_MAX_WORKERS = 16
+
+
+def _video_from_dirent(entry: os.DirEntry, ext: str) -> Optional[VideoInfo]:
+    """Construye un VideoInfo desde una entrada, o None si ya no es accesible."""
+    try:
+        return VideoInfo.from_dirent(entry, ext)
+    except OSError as e:
+        # El archivo desapareció o no es accesible entre readdir y stat
+        logger.warning("Error al cargar video {}: {}", entry.path, e)
+        return None
+
+
+def _iter_video_entries(
+    entries: Iterable[os.DirEntry],
+    formats_pattern: Pattern[str]
+) -> Iterator[Tuple[os.DirEntry, str]]:
+    """Filtra las entradas de video soportadas sin hacer stat."""
+    search = formats_pattern.search
+    for entry in entries:
+        match = search(entry.name)
+        if match and entry.is_file():
+            yield entry, match.group('ext').lower()
+
+
+def scan_video_dir(
+    video_dir: Path,
+    supported_formats: Union[Iterable[str], Pattern[str]],
+    parallel: bool = False
+) -> Iterator[VideoInfo]:
+    """Recorre un directorio con os.scandir y genera los videos soportados.
+    
+    En modo paralelo primero se filtran las entradas y después sus stat se
+    lanzan desde un ThreadPoolExecutor, de modo que la latencia de cada
+    consulta se solapa en sistemas de archivos de red.
+    
+    Args:
+        video_dir: Directorio a recorrer
+        supported_formats: Extensiones soportadas (con punto) o el patrón
+            ya compilado con compile_formats_pattern
+        parallel: Si es True, consulta los metadatos en paralelo
+        
+    Yields:
+        VideoInfo de cada archivo de video encontrado
+    """
+    if isinstance(supported_formats, re.Pattern):
+        formats_pattern = supported_formats
+    else:
+        formats_pattern = compile_formats_pattern(supported_formats)
+    
+    with os.scandir(video_dir) as it:
+        candidates = _iter_video_entries(it, formats_pattern)
+        
+        if parallel:
+            candidates = list(candidates)
+            if not candidates:
+                return
+            with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+                videos = list(executor.map(lambda c: _video_from_dirent(*c), candidates))
+        else:
+            videos = (_video_from_dirent(entry, ext) for entry, ext in candidates)
+        
+        for video_info in videos:
+            if video_info is not None:
+                yield video_info
+
+
 # Configuración por defecto del sistema
 DEFAULT_SYSTEM_CONFIG = SystemConfig()
 DEFAULT_VLC_CONFIG = VLCConfig()
\ No newline at end of file
@@ -1,41 +1,43 @@
-"""Sistema de logging unificado usando loguru (Singleton Pattern).
+"""Sistema de logging unificado usando loguru.
 
-Este módulo implementa un sistema de logging centralizado para el sistema
-de cartelería digital, utilizando el patrón Singleton para garantizar
-una única instancia del logger en toda la aplicación.
+Este módulo configura el logger de loguru para el sistema de cartelería
+digital. loguru ya expone una única instancia global, por lo que basta con
+configurar sus handlers una sola vez y reexportar ``logger``.
 """
 
 from loguru import logger
 import sys
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from loguru import Logger
 
-class Logger:
-    """Sistema de logging unificado usando loguru (Singleton Pattern).
-    
-    Esta clase implementa el patrón Singleton para proporcionar un sistema
-    de logging centralizado y configurado para el sistema de cartelería digital.
-    """
+__all__ = ['logger', 'setup_logger']
+
+_configured = False
+_setup_lock = threading.Lock()
+
+
+def setup_logger(log_dir: str = "/home/pi/kdx-pi-signage/logs") -> "Logger":
+    """Configura el sistema de logging con loguru.
     
-    _instance: Optional['Logger'] = None
-    _configured: bool = False
+    Solo la primera llamada configura los handlers; las siguientes
+    devuelven el logger sin modificarlo.
     
-    def __new__(cls) -> 'Logger':
-        """Implementa el patrón Singleton para el logger."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    Args:
+        log_dir: Directorio donde se almacenarán los archivos de log
+        
+    Returns:
+        Logger configurado de loguru
+    """
+    global _configured
     
-    def setup_logger(self, log_dir: str = "/home/pi/kdx-pi-signage/logs") -> None:
-        """Configura el sistema de logging con loguru.
+    with _setup_lock:
+        if _configured:
+            return logger
         
-        Args:
-            log_dir: Directorio donde se almacenarán los archivos de log
-        """
-        if self._configured:
-            return
-            
         # Crear directorio de logs si no existe
         Path(log_dir).mkdir(parents=True, exist_ok=True)
         
@@ -49,6 +51,9 @@ class Logger:
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
         )
         
+        # Los handlers de archivo escriben desde un hilo propio (enqueue) para
+        # que una escritura lenta en la SD no bloquee el bucle de reproducción
+        
         # Handler para archivo principal con rotación
         logger.add(
             f"{log_dir}/signage.log",
@@ -56,7 +61,10 @@ class Logger:
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             rotation="10 MB",
             retention="30 days",
-            compression="zip"
+            compression="zip",
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
         )
         
         # Handler para errores críticos
@@ -65,22 +73,13 @@ class Logger:
             level="ERROR",
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             rotation="1 day",
-            retention="90 days"
+            retention="90 days",
+            enqueue=True,
+            backtrace=False,
+            diagnose=False
         )
         
-        self._configured = True
-        logger.info("Sistema de logging configurado correctamente")
+        _configured = True
     
-    def get_logger(self):
-        """Obtiene la instancia del logger configurado.
-        
-        Returns:
-            Logger configurado de loguru
-        """
-        if not self._configured:
-            self.setup_logger()
-        return logger
-
-
-# Instancia global del logger
-app_logger = Logger()
\ No newline at end of file
+    logger.info("Sistema de logging configurado correctamente")
+    return logger
@@ -6,13 +6,13 @@ la interacción entre los diferentes subsistemas.
 """
 
 import sys
-import time
 import signal
 import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from logger import app_logger
+from logger import logger, setup_logger
 from config import SystemConfig, DEFAULT_SYSTEM_CONFIG
 from video_player import VideoPlayer, VideoPlayerError
 from playlist_manager import PlaylistManager
@@ -26,14 +26,24 @@ class SignageSystem:
     componentes del sistema y proporcionar una interfaz unificada.
     """
     
-    def __init__(self, config: Optional[SystemConfig] = None):
+    # Intervalo de respaldo para consultar a VLC si no llega el evento de fin
+    VIDEO_END_POLL_INTERVAL = 5.0
+    
+    def __init__(self, config: Optional[SystemConfig] = None,
+                 executor: Optional[Executor] = None,
+                 wait: Optional[Callable[[float], bool]] = None):
         """Inicializa el sistema de cartelería.
         
         Args:
             config: Configuración del sistema. Si es None, usa la configuración por defecto.
+            executor: Ejecutor para las actualizaciones de playlist. Si es None,
+                usa un ThreadPoolExecutor de un único hilo.
+            wait: Función de espera que recibe los segundos y devuelve True si
+                se interrumpió por parada. Si es None, espera sobre el evento
+                de parada del sistema.
         """
         self.config = config or DEFAULT_SYSTEM_CONFIG
-        self.logger = app_logger.get_logger()
+        self.logger = logger
         
         # Componentes del sistema
         self.video_player: Optional[VideoPlayer] = None
@@ -44,6 +54,17 @@ class SignageSystem:
         self._running = False
         self._main_thread: Optional[threading.Thread] = None
         self._shutdown_event = threading.Event()
+        self._video_end = threading.Event()
+        self._wait = wait or self._shutdown_event.wait
+        
+        # Actualizaciones de playlist: un único hilo y como máximo una pendiente.
+        # Solo se apaga en la limpieza el ejecutor creado aquí, no uno inyectado
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='playlist-refresh'
+        )
+        self._refresh_lock = threading.Lock()
+        self._refresh_pending = False
         
         # Contadores de error
         self._error_count = 0
@@ -60,12 +81,7 @@ class SignageSystem:
         try:
             self.logger.info("Inicializando componentes del sistema...")
             
-            # Verificar directorio de videos
-            if not self.config.video_dir.exists():
-                self.logger.warning(f"Creando directorio de videos: {self.config.video_dir}")
-                self.config.video_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Inicializar escáner de videos
+            # Inicializar escáner de videos (SystemConfig ya creó video_dir)
             self.video_scanner = VideoScanner(self.config)
             if not self.video_scanner.validate_directory():
                 self.logger.error("Directorio de videos no válido")
@@ -79,7 +95,7 @@ class SignageSystem:
             if video_count == 0:
                 self.logger.warning("No se encontraron videos en el directorio")
             else:
-                self.logger.info(f"Cargados {video_count} videos")
+                self.logger.info("Cargados {} videos", video_count)
             
             # Inicializar reproductor de video
             self.video_player = VideoPlayer()
@@ -95,7 +111,7 @@ class SignageSystem:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error durante la inicialización: {e}")
+            self.logger.error("Error durante la inicialización: {}", e)
             return False
     
     def start(self) -> bool:
@@ -124,7 +140,7 @@ class SignageSystem:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error al iniciar el sistema: {e}")
+            self.logger.error("Error al iniciar el sistema: {}", e)
             self._running = False
             return False
     
@@ -138,6 +154,7 @@ class SignageSystem:
         # Señalar parada
         self._running = False
         self._shutdown_event.set()
+        self._video_end.set()
         
         # Esperar a que termine el hilo principal
         if self._main_thread and self._main_thread.is_alive():
@@ -150,27 +167,35 @@ class SignageSystem:
     
     def _main_loop(self) -> None:
         """Bucle principal del sistema de cartelería."""
-        self.logger.info("Iniciando bucle principal de reproducción")
+        log = self.logger
+        log.info("Iniciando bucle principal de reproducción")
         
-        while self._running and not self._shutdown_event.is_set():
+        # Referencias locales para evitar búsquedas de atributos en cada iteración
+        playlist = self.playlist_manager
+        player = self.video_player
+        shutdown = self._shutdown_event
+        video_end = self._video_end
+        
+        while self._running and not shutdown.is_set():
             try:
                 # Verificar si hay videos disponibles
-                if self.playlist_manager.is_empty():
-                    self.logger.warning("No hay videos disponibles, esperando...")
+                if playlist.is_empty():
+                    log.warning("No hay videos disponibles, esperando...")
                     self._wait_or_shutdown(5)
                     continue
                 
                 # Obtener siguiente video
-                current_video = self.playlist_manager.get_current_video()
+                current_video = playlist.get_current_video()
                 if not current_video:
-                    self.logger.warning("No se pudo obtener video actual")
+                    log.warning("No se pudo obtener video actual")
                     self._wait_or_shutdown(2)
                     continue
                 
                 # Reproducir video
-                self.logger.info(f"Reproduciendo: {current_video.filename}")
+                log.info("Reproduciendo: {}", current_video.filename)
                 
-                if self.video_player.play_video(str(current_video.file_path)):
+                video_end.clear()
+                if player.play_video(current_video.file_path):
                     # Resetear contador de errores consecutivos
                     self._consecutive_errors = 0
                     
@@ -178,28 +203,34 @@ class SignageSystem:
                     self._wait_for_video_end()
                     
                     # Avanzar al siguiente video
-                    next_video = self.playlist_manager.get_next_video()
-                    if not next_video and not self.playlist_manager._playlist.loop_enabled:
-                        self.logger.info("Playlist completada sin bucle, re-escaneando...")
+                    next_video = playlist.get_next_video()
+                    if not next_video and not playlist.is_loop_enabled():
+                        log.info("Playlist completada sin bucle, re-escaneando...")
                         self._refresh_playlist()
                 
                 else:
-                    self.logger.error(f"Error al reproducir video: {current_video.filename}")
+                    log.error("Error al reproducir video: {}", current_video.filename)
                     self._handle_playback_error()
                 
             except Exception as e:
-                self.logger.error(f"Error en bucle principal: {e}")
+                log.error("Error en bucle principal: {}", e)
                 self._handle_playback_error()
         
-        self.logger.info("Bucle principal terminado")
+        log.info("Bucle principal terminado")
     
     def _wait_for_video_end(self) -> None:
-        """Espera a que termine la reproducción del video actual."""
-        while (self._running and 
-               not self._shutdown_event.is_set() and 
-               self.video_player.is_playing()):
-            
-            self._wait_or_shutdown(1)
+        """Espera a que termine la reproducción del video actual.
+        
+        Se despierta en cuanto VLC notifica el fin del video (o una parada
+        del sistema); el estado de VLC solo se consulta como respaldo.
+        """
+        while self._running and not self._shutdown_event.is_set():
+            if self._video_end.wait(self.VIDEO_END_POLL_INTERVAL):
+                break
+            if not self.video_player.is_playing():
+                break
+        
+        self._video_end.clear()
     
     def _wait_or_shutdown(self, seconds: float) -> bool:
         """Espera el tiempo especificado o hasta que se señale la parada.
@@ -210,15 +241,17 @@ class SignageSystem:
         Returns:
             True si se completó la espera, False si se señaló parada
         """
-        return not self._shutdown_event.wait(seconds)
+        return not self._wait(seconds)
     
     def _on_video_end(self) -> None:
         """Callback llamado cuando termina la reproducción de un video."""
         self.logger.debug("Video terminado, continuando con siguiente")
+        self._video_end.set()
     
     def _on_video_error(self) -> None:
         """Callback llamado cuando ocurre un error en la reproducción."""
         self.logger.error("Error en reproducción de video")
+        self._video_end.set()
         self._handle_playback_error()
     
     def _on_directory_change(self, change_info: dict) -> None:
@@ -227,10 +260,29 @@ class SignageSystem:
         Args:
             change_info: Información sobre los cambios detectados
         """
-        self.logger.info(f"Cambios detectados en directorio: {change_info}")
+        self.logger.info("Cambios detectados en directorio: {}", change_info)
         
-        # Programar actualización de playlist
-        threading.Thread(target=self._refresh_playlist, daemon=True).start()
+        if self._shutdown_event.is_set():
+            return
+        
+        # Programar actualización de playlist; las ráfagas de cambios se
+        # agrupan en una única actualización pendiente
+        with self._refresh_lock:
+            if self._refresh_pending:
+                return
+            self._refresh_pending = True
+        
+        self._executor.submit(self._run_pending_refresh)
+    
+    def _run_pending_refresh(self) -> None:
+        """Ejecuta la actualización de playlist pendiente."""
+        with self._refresh_lock:
+            self._refresh_pending = False
+        
+        if self._shutdown_event.is_set():
+            return
+        
+        self._refresh_playlist()
     
     def _refresh_playlist(self) -> None:
         """Actualiza la playlist con los videos actuales del directorio."""
@@ -243,17 +295,17 @@ class SignageSystem:
             if video_count == 0:
                 self.logger.warning("No se encontraron videos después de la actualización")
             else:
-                self.logger.info(f"Playlist actualizada con {video_count} videos")
+                self.logger.info("Playlist actualizada con {} videos", video_count)
             
         except Exception as e:
-            self.logger.error(f"Error al actualizar playlist: {e}")
+            self.logger.error("Error al actualizar playlist: {}", e)
     
     def _handle_playback_error(self) -> None:
         """Maneja errores de reproducción."""
         self._error_count += 1
         self._consecutive_errors += 1
         
-        self.logger.warning(f"Error de reproducción #{self._consecutive_errors}")
+        self.logger.warning("Error de reproducción #{}", self._consecutive_errors)
         
         # Si hay muchos errores consecutivos, re-escanear
         if self._consecutive_errors >= self.config.max_retries:
@@ -267,6 +319,11 @@ class SignageSystem:
     def _cleanup(self) -> None:
         """Limpia todos los recursos del sistema."""
         try:
+            # Descartar actualizaciones de playlist pendientes antes de liberar
+            # los componentes que usarían
+            if self._owns_executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            
             if self.video_player:
                 self.video_player.cleanup()
             
@@ -276,7 +333,7 @@ class SignageSystem:
             self.logger.info("Recursos del sistema liberados")
             
         except Exception as e:
-            self.logger.error(f"Error durante la limpieza: {e}")
+            self.logger.error("Error durante la limpieza: {}", e)
     
     def get_system_status(self) -> dict:
         """Obtiene el estado actual del sistema.
@@ -319,8 +376,7 @@ def signal_handler(signum, frame):
     """
     global signage_system
     
-    logger = app_logger.get_logger()
-    logger.info(f"Señal recibida: {signum}")
+    logger.info("Señal recibida: {}", signum)
     
     if signage_system:
         signage_system.stop()
@@ -333,8 +389,7 @@ def main():
     global signage_system
     
     # Configurar logging
-    app_logger.setup_logger()
-    logger = app_logger.get_logger()
+    setup_logger()
     
     logger.info("=== Iniciando Sistema de Cartelería Digital KDX ===")
     logger.info("Versión: 1.0.0")
@@ -354,15 +409,14 @@ def main():
             logger.error("No se pudo iniciar el sistema")
             sys.exit(1)
         
-        # Mantener el programa ejecutándose
+        # Mantener el programa ejecutándose hasta que se señale la parada
         try:
-            while signage_system._running:
-                time.sleep(1)
+            signage_system._shutdown_event.wait()
         except KeyboardInterrupt:
             logger.info("Interrupción por teclado recibida")
         
     except Exception as e:
-        logger.error(f"Error crítico en el sistema: {e}")
+        logger.error("Error crítico en el sistema: {}", e)
         sys.exit(1)
     
     finally:
@@ -370,6 +424,9 @@ def main():
             signage_system.stop()
         
         logger.info("=== Sistema de Cartelería Digital Terminado ===")
+        
+        # Vaciar la cola de los handlers de archivo antes de salir
+        logger.complete()
 
 
 if __name__ == "__main__":
@@ -5,23 +5,25 @@ estrategias de reproducción de listas de videos en el sistema de
 cartelería digital.
 """
 
+import os
 import random
-from abc import ABC, abstractmethod
-from typing import List, Optional, Protocol
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Dict, List, Optional, Protocol
 from pathlib import Path
 
-from logger import app_logger
-from config import VideoInfo, Playlist, SystemConfig, DEFAULT_SYSTEM_CONFIG
+from logger import logger
+from config import VideoInfo, Playlist, SystemConfig, DEFAULT_SYSTEM_CONFIG, scan_video_dir
 
 
-class PlaybackStrategy(ABC):
-    """Estrategia abstracta para reproducción de playlist.
+class PlaybackStrategy(Protocol):
+    """Interfaz de las estrategias de reproducción de playlist.
     
     Define la interfaz común para diferentes estrategias de reproducción
-    utilizando el patrón Strategy.
+    utilizando el patrón Strategy. Es un protocolo estructural: las
+    estrategias no heredan de él, basta con que implementen sus métodos.
     """
     
-    @abstractmethod
     def get_next_video(self, playlist: Playlist) -> Optional[VideoInfo]:
         """Obtiene el siguiente video según la estrategia.
         
@@ -31,19 +33,18 @@ class PlaybackStrategy(ABC):
         Returns:
             VideoInfo del siguiente video o None si no hay más videos
         """
-        pass
+        ...
     
-    @abstractmethod
     def reset(self, playlist: Playlist) -> None:
         """Reinicia la estrategia de reproducción.
         
         Args:
             playlist: Lista de reproducción a reiniciar
         """
-        pass
+        ...
 
 
-class SequentialStrategy(PlaybackStrategy):
+class SequentialStrategy:
     """Estrategia de reproducción secuencial.
     
     Reproduce los videos en orden secuencial, reiniciando al final
@@ -59,17 +60,20 @@ class SequentialStrategy(PlaybackStrategy):
         Returns:
             VideoInfo del siguiente video o None si no hay más videos
         """
-        if not playlist.videos:
+        videos = playlist.videos
+        if not videos:
             return None
         
-        # Si estamos al final y no hay bucle, retornar None
-        if playlist.current_index >= len(playlist.videos) - 1 and not playlist.loop_enabled:
-            return None
-        
-        # Avanzar al siguiente índice
-        playlist.current_index = (playlist.current_index + 1) % len(playlist.videos)
+        # Avanzar al siguiente índice; al final, volver al inicio solo si
+        # el bucle está habilitado
+        next_index = playlist.current_index + 1
+        if next_index >= len(videos):
+            if not playlist.loop_enabled:
+                return None
+            next_index = 0
         
-        return playlist.videos[playlist.current_index]
+        playlist.current_index = next_index
+        return videos[next_index]
     
     def reset(self, playlist: Playlist) -> None:
         """Reinicia la reproducción al primer video.
@@ -80,63 +84,71 @@ class SequentialStrategy(PlaybackStrategy):
         playlist.current_index = 0
 
 
-class ShuffleStrategy(PlaybackStrategy):
+class ShuffleStrategy:
     """Estrategia de reproducción aleatoria.
     
     Reproduce los videos en orden aleatorio, evitando repetir
     el mismo video consecutivamente.
     """
     
-    def __init__(self):
-        """Inicializa la estrategia de reproducción aleatoria."""
-        self._played_indices: List[int] = []
+    def __init__(self, rng: Optional[random.Random] = None):
+        """Inicializa la estrategia de reproducción aleatoria.
+        
+        Args:
+            rng: Generador aleatorio a usar. Si es None, crea uno propio.
+        """
+        self._rng = rng or random.Random()
+        
+        # Orden aleatorio del ciclo actual y posición dentro de él
+        self._order: List[int] = []
+        self._pos: int = 0
         self._last_index: Optional[int] = None
     
     def get_next_video(self, playlist: Playlist) -> Optional[VideoInfo]:
         """Obtiene el siguiente video de forma aleatoria.
         
+        Cada ciclo baraja todos los índices una sola vez (Fisher–Yates) y
+        los recorre en ese orden, de modo que cada video se reproduce una
+        vez por ciclo.
+        
         Args:
             playlist: Lista de reproducción actual
             
         Returns:
             VideoInfo del siguiente video o None si no hay más videos
         """
-        if not playlist.videos:
+        videos = playlist.videos
+        if not videos:
             return None
         
         # Si solo hay un video, devolverlo
-        if len(playlist.videos) == 1:
+        if len(videos) == 1:
             playlist.current_index = 0
-            return playlist.videos[0]
+            return videos[0]
         
-        # Si hemos reproducido todos los videos, reiniciar si hay bucle
-        if len(self._played_indices) >= len(playlist.videos):
-            if not playlist.loop_enabled:
+        order = self._order
+        
+        # Nuevo ciclo al agotar el actual o si cambió el número de videos
+        if self._pos >= len(order) or len(order) != len(videos):
+            if order and self._pos >= len(order) and not playlist.loop_enabled:
                 return None
-            self._played_indices.clear()
-        
-        # Obtener índices disponibles (no reproducidos)
-        available_indices = [
-            i for i in range(len(playlist.videos))
-            if i not in self._played_indices
-        ]
-        
-        # Si el último video reproducido está en los disponibles, removerlo
-        # para evitar repetición inmediata
-        if self._last_index is not None and self._last_index in available_indices:
-            if len(available_indices) > 1:  # Solo si hay más opciones
-                available_indices.remove(self._last_index)
-        
-        # Seleccionar índice aleatorio
-        if available_indices:
-            selected_index = random.choice(available_indices)
-            self._played_indices.append(selected_index)
-            self._last_index = selected_index
-            playlist.current_index = selected_index
             
-            return playlist.videos[selected_index]
+            order = list(range(len(videos)))
+            self._rng.shuffle(order)
+            
+            # Evitar repetir inmediatamente el último video del ciclo anterior
+            if order[0] == self._last_index:
+                order[0], order[1] = order[1], order[0]
+            
+            self._order = order
+            self._pos = 0
         
-        return None
+        selected_index = order[self._pos]
+        self._pos += 1
+        self._last_index = selected_index
+        playlist.current_index = selected_index
+        
+        return videos[selected_index]
     
     def reset(self, playlist: Playlist) -> None:
         """Reinicia la estrategia de reproducción aleatoria.
@@ -144,7 +156,8 @@ class ShuffleStrategy(PlaybackStrategy):
         Args:
             playlist: Lista de reproducción a reiniciar
         """
-        self._played_indices.clear()
+        self._order = []
+        self._pos = 0
         self._last_index = None
         playlist.current_index = 0
 
@@ -163,15 +176,22 @@ class PlaylistManager:
             config: Configuración del sistema. Si es None, usa la configuración por defecto.
         """
         self.config = config or DEFAULT_SYSTEM_CONFIG
-        self.logger = app_logger.get_logger()
+        self.logger = logger
         
         # Estado de la playlist
         self._playlist = Playlist()
         
+        # Vistas derivadas de la lista indexada: índice ruta -> posición y
+        # nombres de archivo en paralelo a playlist.videos
+        self._path_index: Dict[str, int] = {}
+        self._filenames: List[str] = []
+        self._sort_keys: List[str] = []
+        self._indexed_videos: Optional[List[VideoInfo]] = None
+        
         # Estrategias de reproducción
         self._sequential_strategy = SequentialStrategy()
         self._shuffle_strategy = ShuffleStrategy()
-        self._current_strategy = self._sequential_strategy
+        self._current_strategy: PlaybackStrategy = self._sequential_strategy
         
         self.logger.info("PlaylistManager inicializado")
     
@@ -189,48 +209,80 @@ class PlaylistManager:
         
         video_dir = Path(directory_path)
         
-        if not video_dir.exists():
-            self.logger.warning(f"Directorio de videos no existe: {directory_path}")
-            return 0
-        
-        videos = []
+        keyed_videos = []
         video_count = 0
+        log_debug = self.logger.debug
         
         try:
-            # Buscar archivos de video en el directorio
-            for file_path in video_dir.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in self.config.supported_formats:
-                    try:
-                        video_info = VideoInfo(
-                            file_path=file_path,
-                            filename=file_path.name,
-                            file_size=file_path.stat().st_size,
-                            format_extension=file_path.suffix.lower()
-                        )
-                        videos.append(video_info)
-                        video_count += 1
-                        self.logger.debug(f"Video cargado: {file_path.name}")
-                    except Exception as e:
-                        self.logger.warning(f"Error al cargar video {file_path}: {e}")
+            # Buscar archivos de video en el directorio; os.scandir ya falla
+            # si no existe, sin un stat previo
+            for video_info in scan_video_dir(
+                video_dir,
+                self.config.supported_formats_pattern,
+                parallel=self.config.parallel_scan
+            ):
+                # La clave de orden se calcula una vez, al descubrir el video
+                keyed_videos.append((video_info.filename.lower(), video_info))
+                video_count += 1
+                # Formato diferido: loguru descarta el mensaje sin formatearlo
+                # si DEBUG no está habilitado en ningún handler
+                log_debug("Video cargado: {}", video_info.filename)
             
             # Ordenar videos por nombre para reproducción consistente
-            videos.sort(key=lambda v: v.filename.lower())
+            keyed_videos.sort(key=itemgetter(0))
+            videos = [video_info for _, video_info in keyed_videos]
             
             # Actualizar playlist
             self._playlist.videos = videos
             self._playlist.current_index = 0
+            self._rebuild_path_index()
             
             # Reiniciar estrategia actual
             self._current_strategy.reset(self._playlist)
             
             self.logger.info(f"Cargados {video_count} videos desde {directory_path}")
             
+        except FileNotFoundError:
+            self.logger.warning(f"Directorio de videos no existe: {directory_path}")
+            return 0
         except Exception as e:
             self.logger.error(f"Error al cargar videos desde {directory_path}: {e}")
             return 0
         
         return video_count
     
+    def _rebuild_path_index(self) -> Dict[str, int]:
+        """Reconstruye el índice ruta -> posición y la lista de nombres.
+        
+        Returns:
+            Índice actualizado
+        """
+        videos = self._playlist.videos
+        path_index: Dict[str, int] = {}
+        for i, video_info in enumerate(videos):
+            # Ante rutas duplicadas prevalece la primera aparición
+            path_index.setdefault(video_info.file_path, i)
+        
+        self._path_index = path_index
+        self._filenames = [video_info.filename for video_info in videos]
+        self._sort_keys = [filename.lower() for filename in self._filenames]
+        self._indexed_videos = videos
+        return path_index
+    
+    def _get_path_index(self) -> Dict[str, int]:
+        """Obtiene el índice ruta -> posición, reconstruyéndolo si quedó obsoleto.
+        
+        Returns:
+            Índice sincronizado con la lista de videos actual
+        """
+        videos = self._playlist.videos
+        if (self._indexed_videos is not videos
+                or len(self._path_index) != len(videos)
+                or len(self._filenames) != len(videos)
+                or len(self._sort_keys) != len(videos)):
+            return self._rebuild_path_index()
+        return self._path_index
+    
     def get_current_video(self) -> Optional[VideoInfo]:
         """Obtiene el video actual de la playlist.
         
@@ -278,6 +330,14 @@ class PlaylistManager:
         else:
             self.logger.info("Modo bucle deshabilitado")
     
+    def is_loop_enabled(self) -> bool:
+        """Verifica si el bucle de reproducción está habilitado.
+        
+        Returns:
+            True si la playlist se repite al finalizar
+        """
+        return self._playlist.loop_enabled
+    
     def reset_playlist(self) -> None:
         """Reinicia la playlist al primer video."""
         self._current_strategy.reset(self._playlist)
@@ -289,13 +349,16 @@ class PlaylistManager:
         Returns:
             Diccionario con información de la playlist
         """
+        playlist = self._playlist
+        current_video = playlist.get_current_video()
+        
         return {
-            'total_videos': len(self._playlist.videos),
-            'current_index': self._playlist.current_index,
-            'shuffle_enabled': self._playlist.shuffle_enabled,
-            'loop_enabled': self._playlist.loop_enabled,
-            'is_empty': self._playlist.is_empty(),
-            'current_video': self._playlist.get_current_video().filename if self._playlist.get_current_video() else None
+            'total_videos': len(playlist.videos),
+            'current_index': playlist.current_index,
+            'shuffle_enabled': playlist.shuffle_enabled,
+            'loop_enabled': playlist.loop_enabled,
+            'is_empty': playlist.is_empty(),
+            'current_video': current_video.filename if current_video else None
         }
     
     def add_video(self, video_path: str) -> bool:
@@ -308,20 +371,43 @@ class PlaylistManager:
             True si se añadió correctamente, False en caso contrario
         """
         try:
-            video_file = Path(video_path)
+            file_path = str(Path(video_path))
+            filename = os.path.basename(file_path)
             
-            if not video_file.exists():
-                self.logger.error(f"Archivo de video no encontrado: {video_path}")
+            # Mismo patrón que usan el escaneo y el vigilante del directorio
+            match = self.config.supported_formats_pattern.search(filename)
+            if match is None:
+                self.logger.error(f"Formato de video no soportado: {filename}")
                 return False
+            ext = match.group('ext').lower()
             
-            if video_file.suffix.lower() not in self.config.supported_formats:
-                self.logger.error(f"Formato de video no soportado: {video_file.suffix}")
+            # Un único stat comprueba la existencia y aporta los metadatos
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                self.logger.error(f"Archivo de video no encontrado: {video_path}")
                 return False
             
-            video_info = VideoInfo(file_path=video_file)
-            self._playlist.videos.append(video_info)
+            video_info = VideoInfo.fast_build(file_path, st, filename, ext)
+            videos = self._playlist.videos
+            path_index = self._get_path_index()
+            
+            # Insertar manteniendo el orden por nombre de la carga inicial
+            sort_key = video_info.filename.lower()
+            position = bisect_right(self._sort_keys, sort_key)
+            videos.insert(position, video_info)
+            
+            if position == len(videos) - 1:
+                # Al final: basta con extender las vistas derivadas
+                path_index.setdefault(video_info.file_path, position)
+                self._filenames.append(video_info.filename)
+                self._sort_keys.append(sort_key)
+            else:
+                self._rebuild_path_index()
+                if position <= self._playlist.current_index:
+                    self._playlist.current_index += 1
             
-            self.logger.info(f"Video añadido a la playlist: {video_file.name}")
+            self.logger.info(f"Video añadido a la playlist: {filename}")
             return True
             
         except Exception as e:
@@ -339,22 +425,30 @@ class PlaylistManager:
         """
         try:
             video_file = Path(video_path)
+            videos = self._playlist.videos
+            path_index = self._get_path_index()
             
             # Buscar el video en la playlist
-            for i, video_info in enumerate(self._playlist.videos):
-                if video_info.file_path == video_file:
-                    # Ajustar índice actual si es necesario
-                    if i < self._playlist.current_index:
-                        self._playlist.current_index -= 1
-                    elif i == self._playlist.current_index:
-                        # Si removemos el video actual, reiniciar
-                        self._playlist.current_index = 0
-                    
-                    # Remover video
-                    self._playlist.videos.pop(i)
-                    
-                    self.logger.info(f"Video removido de la playlist: {video_file.name}")
-                    return True
+            i = path_index.pop(str(video_file), None)
+            if i is not None:
+                # Ajustar índice actual si es necesario
+                if i < self._playlist.current_index:
+                    self._playlist.current_index -= 1
+                elif i == self._playlist.current_index:
+                    # Si removemos el video actual, reiniciar
+                    self._playlist.current_index = 0
+                
+                # Remover video y desplazar las posiciones posteriores
+                videos.pop(i)
+                self._filenames.pop(i)
+                self._sort_keys.pop(i)
+                for j in range(i, len(videos)):
+                    path = videos[j].file_path
+                    if path_index.get(path) == j + 1:
+                        path_index[path] = j
+                
+                self.logger.info(f"Video removido de la playlist: {video_file.name}")
+                return True
             
             self.logger.warning(f"Video no encontrado en la playlist: {video_path}")
             return False
@@ -393,4 +487,5 @@ class PlaylistManager:
         Returns:
             Lista de nombres de archivos de video
         """
-        return [video.filename for video in self._playlist.videos]
\ No newline at end of file
+        self._get_path_index()
+        return list(self._filenames)
\ No newline at end of file
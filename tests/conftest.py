@@ -1,12 +1,10 @@
 """Configuración y fixtures compartidas para pytest."""
 
 import pytest
-import tempfile
-import shutil
 import sys
 from pathlib import Path
-from unittest.mock import Mock, MagicMock, patch
-from typing import Generator
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, create_autospec, patch
 
 # Mock VLC antes de cualquier importación
 mock_vlc = MagicMock()
@@ -18,15 +16,25 @@ mock_vlc.EventType.MediaPlayerEncounteredError = 'Error'
 sys.modules['vlc'] = mock_vlc
 
 from config import SystemConfig, VLCConfig, VideoInfo, Playlist
-from logger import app_logger
+from logger import setup_logger as configure_logger
+from playlist_manager import PlaylistManager
+from video_player import VideoPlayer
+from video_scanner import VideoScanner
+from tests.fixtures import FakeClock, InlineExecutor, SampleVideos
+
+
+def pytest_collection_modifyitems(config, items):
+    """Marca cada test como ``unit`` o ``integration`` según su directorio."""
+    for item in items:
+        marker = item.path.parent.name
+        if marker in ('unit', 'integration'):
+            item.add_marker(marker)
 
 
 @pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
-    """Crea un directorio temporal para tests."""
-    temp_path = Path(tempfile.mkdtemp())
-    yield temp_path
-    shutil.rmtree(temp_path, ignore_errors=True)
+def temp_dir(tmp_path: Path) -> Path:
+    """Directorio temporal propio de cada test (y de cada worker de xdist)."""
+    return tmp_path
 
 
 @pytest.fixture
@@ -45,6 +53,17 @@ def log_dir(temp_dir: Path) -> Path:
     return log_path
 
 
+@pytest.fixture(scope="session")
+def shared_config_dirs(tmp_path_factory: pytest.TempPathFactory) -> dict:
+    """Directorios ya creados para tests que solo validan campos de SystemConfig."""
+    base = tmp_path_factory.mktemp("shared_config")
+    video_path = base / "videos"
+    log_path = base / "logs"
+    video_path.mkdir()
+    log_path.mkdir()
+    return {'video_dir': video_path, 'log_dir': log_path}
+
+
 @pytest.fixture
 def test_config(video_dir: Path, log_dir: Path) -> SystemConfig:
     """Configuración de prueba con directorios temporales."""
@@ -59,8 +78,20 @@ def test_config(video_dir: Path, log_dir: Path) -> SystemConfig:
 
 
 @pytest.fixture
+def inline_executor() -> InlineExecutor:
+    """Ejecutor síncrono para despachar las tareas en segundo plano sin hilos."""
+    return InlineExecutor()
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    """Reloj simulado para sustituir las esperas reales del sistema."""
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
 def vlc_config() -> VLCConfig:
-    """Configuración de VLC para pruebas."""
+    """Configuración de VLC para pruebas (inmutable, compartida por la sesión)."""
     return VLCConfig(
         interface='dummy',
         fullscreen=False,  # Para tests
@@ -72,29 +103,44 @@ def vlc_config() -> VLCConfig:
     )
 
 
-@pytest.fixture
-def sample_video_files(video_dir: Path) -> list[Path]:
-    """Crea archivos de video de muestra para tests."""
+def _create_sample_video_files(directory: Path) -> list[Path]:
+    """Crea los archivos de video de muestra en el directorio indicado."""
     video_files = []
     
     # Crear archivos de video simulados
     for i, ext in enumerate(['.mp4', '.avi', '.mkv'], 1):
-        video_file = video_dir / f"test_video_{i}{ext}"
-        video_file.write_text(f"fake video content {i}")
+        video_file = directory / f"test_video_{i}{ext}"
+        video_file.write_bytes(b"fake video content %d" % i)
         video_files.append(video_file)
     
     # Crear un archivo no-video para tests
-    non_video = video_dir / "not_a_video.txt"
-    non_video.write_text("this is not a video")
+    non_video = directory / "not_a_video.txt"
+    non_video.write_bytes(b"this is not a video")
     
     return video_files
 
 
 @pytest.fixture
-def sample_video_info(sample_video_files: list[Path]) -> list[VideoInfo]:
-    """Crea objetos VideoInfo de muestra."""
+def sample_video_files(video_dir: Path) -> list[Path]:
+    """Crea archivos de video de muestra para tests."""
+    return _create_sample_video_files(video_dir)
+
+
+@pytest.fixture(scope="session")
+def sample_video_files_ro(tmp_path_factory: pytest.TempPathFactory) -> list[Path]:
+    """Archivos de video de muestra compartidos por la sesión (solo lectura)."""
+    return _create_sample_video_files(tmp_path_factory.mktemp("videos_template"))
+
+
+@pytest.fixture(scope="session")
+def sample_video_info(sample_video_files_ro: list[Path]) -> list[VideoInfo]:
+    """Crea objetos VideoInfo de muestra, compartidos por toda la sesión.
+    
+    Los tests no deben modificar la lista; al terminar la sesión se
+    comprueba que sigue intacta.
+    """
     video_infos = []
-    for video_file in sample_video_files:
+    for video_file in sample_video_files_ro:
         video_info = VideoInfo(
             file_path=video_file,
             filename=video_file.name,
@@ -104,12 +150,22 @@ def sample_video_info(sample_video_files: list[Path]) -> list[VideoInfo]:
             last_modified=video_file.stat().st_mtime
         )
         video_infos.append(video_info)
-    return video_infos
+    
+    snapshot = list(video_infos)
+    yield video_infos
+    assert video_infos == snapshot, "sample_video_info fue modificada por un test"
 
 
-@pytest.fixture
-def sample_playlist(sample_video_info: list[VideoInfo]) -> Playlist:
-    """Crea una playlist de muestra."""
+@pytest.fixture(scope="session")
+def sample_videos(sample_video_info: list[VideoInfo]) -> SampleVideos:
+    """Videos de muestra con su número y el índice del último."""
+    count = len(sample_video_info)
+    return SampleVideos(items=sample_video_info, count=count, last_index=count - 1)
+
+
+@pytest.fixture(scope="session")
+def _sample_playlist_template(sample_video_info: list[VideoInfo]) -> Playlist:
+    """Playlist de muestra validada una única vez por sesión."""
     return Playlist(
         videos=sample_video_info,
         current_index=0,
@@ -118,6 +174,55 @@ def sample_playlist(sample_video_info: list[VideoInfo]) -> Playlist:
     )
 
 
+@pytest.fixture
+def sample_playlist(_sample_playlist_template: Playlist) -> Playlist:
+    """Crea una playlist de muestra.
+    
+    Es una copia sin revalidar de la plantilla de sesión, con su propia
+    lista de videos, por lo que cada test puede modificarla libremente.
+    """
+    return _sample_playlist_template.model_copy(
+        update={'videos': list(_sample_playlist_template.videos)}
+    )
+
+
+@pytest.fixture(scope="module")
+def vlc_mock():
+    """Parchea el módulo vlc de video_player una sola vez por módulo de tests."""
+    with patch('video_player.vlc') as mock_vlc:
+        yield mock_vlc
+
+
+def _wire_vlc_mock(vlc_mock) -> SimpleNamespace:
+    """Reinicia el vlc simulado y conecta una instancia y un reproductor nuevos.
+    
+    Descarta llamadas, valores de retorno y excepciones configurados por
+    tests anteriores.
+    """
+    vlc_mock.reset_mock(return_value=True, side_effect=True)
+    instance = Mock()
+    player = Mock()
+    instance.media_player_new.return_value = player
+    vlc_mock.Instance.return_value = instance
+    return SimpleNamespace(vlc=vlc_mock, instance=instance, player=player)
+
+
+@pytest.fixture
+def vlc_env(vlc_mock) -> SimpleNamespace:
+    """Módulo vlc simulado con instancia y reproductor ya conectados."""
+    return _wire_vlc_mock(vlc_mock)
+
+
+@pytest.fixture
+def player(vlc_env: SimpleNamespace, vlc_config: VLCConfig) -> VideoPlayer:
+    """VideoPlayer recién construido sobre el vlc simulado.
+    
+    Cada test recibe su propio reproductor, con su propio evento de
+    reproducción y sin callbacks configurados.
+    """
+    return VideoPlayer(vlc_config)
+
+
 @pytest.fixture
 def mock_vlc_instance():
     """Mock de la instancia de VLC."""
@@ -137,45 +242,73 @@ def mock_watchdog_observer():
     return mock_observer
 
 
-@pytest.fixture(autouse=True)
-def setup_logger():
-    """Configura el logger para tests."""
-    app_logger.setup_logger()
+@pytest.fixture(scope="session", autouse=True)
+def setup_logger(tmp_path_factory: pytest.TempPathFactory):
+    """Configura el logger una vez para toda la sesión de tests.
+    
+    Los logs van a un directorio temporal de la sesión, de modo que cada
+    worker de pytest-xdist escribe y rota sus propios archivos.
+    """
+    configure_logger(str(tmp_path_factory.mktemp("logs")))
     yield
     # Cleanup si es necesario
 
 
 @pytest.fixture
-def mock_video_player():
-    """Mock del VideoPlayer."""
-    mock_player = Mock()
-    mock_player.play_video.return_value = True
-    mock_player.is_playing.return_value = False
-    mock_player.cleanup = Mock()
-    mock_player.set_on_end_callback = Mock()
-    mock_player.set_on_error_callback = Mock()
-    mock_player.get_current_video.return_value = None
-    return mock_player
-
-
-@pytest.fixture
-def mock_playlist_manager():
-    """Mock del PlaylistManager."""
-    mock_manager = Mock()
-    mock_manager.is_empty.return_value = False
-    mock_manager.get_current_video.return_value = None
-    mock_manager.get_next_video.return_value = None
-    mock_manager.load_videos_from_directory.return_value = 0
-    mock_manager.get_playlist_info.return_value = {}
-    return mock_manager
-
-
-@pytest.fixture
-def mock_video_scanner():
-    """Mock del VideoScanner."""
-    mock_scanner = Mock()
-    mock_scanner.validate_directory.return_value = True
-    mock_scanner.start_monitoring.return_value = True
-    mock_scanner.cleanup = Mock()
-    mock_scanner.get_directory_info.return_value = {}
-    return mock_scanner
\ No newline at end of file
+def mock_video_player() -> SimpleNamespace:
+    """Doble del VideoPlayer con solo los métodos que usa SignageSystem."""
+    return SimpleNamespace(
+        play_video=Mock(return_value=True),
+        is_playing=Mock(return_value=False),
+        cleanup=Mock(),
+        set_on_end_callback=Mock(),
+        set_on_error_callback=Mock(),
+        get_current_video=Mock(return_value=None)
+    )
+
+
+@pytest.fixture
+def mock_playlist_manager() -> SimpleNamespace:
+    """Doble del PlaylistManager con solo los métodos que usa SignageSystem."""
+    return SimpleNamespace(
+        is_empty=Mock(return_value=False),
+        get_current_video=Mock(return_value=None),
+        get_next_video=Mock(return_value=None),
+        load_videos_from_directory=Mock(return_value=0),
+        get_playlist_info=Mock(return_value={})
+    )
+
+
+@pytest.fixture
+def mock_video_scanner() -> SimpleNamespace:
+    """Doble del VideoScanner con solo los métodos que usa SignageSystem."""
+    return SimpleNamespace(
+        validate_directory=Mock(return_value=True),
+        start_monitoring=Mock(return_value=True),
+        cleanup=Mock(),
+        get_directory_info=Mock(return_value={})
+    )
+
+
+@pytest.fixture(scope="session")
+def _mock_templates() -> dict:
+    """Mocks con autospec de los componentes, creados una vez por sesión.
+    
+    create_autospec recorre toda la clase para comprobar también las
+    firmas de los métodos; hacerlo una sola vez evita repetir ese coste
+    en cada test.
+    """
+    return {
+        'scanner': create_autospec(VideoScanner, instance=True),
+        'manager': create_autospec(PlaylistManager, instance=True),
+        'player': create_autospec(VideoPlayer, instance=True),
+    }
+
+
+@pytest.fixture
+def mock_components(_mock_templates: dict) -> dict:
+    """Mocks de escáner, gestor y reproductor reiniciados para cada test."""
+    for mock in _mock_templates.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    _mock_templates['scanner'].validate_directory.return_value = True
+    return _mock_templates
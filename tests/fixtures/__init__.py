@@ -1 +1,60 @@
-"""Fixtures y datos de prueba para los tests."""
\ No newline at end of file
+"""Fixtures y datos de prueba para los tests."""
+
+from collections import namedtuple
+from concurrent.futures import Executor, Future
+
+
+# Videos de muestra junto con sus magnitudes derivadas
+SampleVideos = namedtuple('SampleVideos', ['items', 'count', 'last_index'])
+
+
+class InlineExecutor(Executor):
+    """Ejecutor que ejecuta las tareas de forma síncrona en el hilo llamante."""
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Ejecuta ``fn`` inmediatamente y devuelve un Future ya resuelto."""
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+
+class FakeClock:
+    """Reloj simulado que registra las esperas sin dormir."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.waits = []
+    
+    def wait(self, seconds: float) -> bool:
+        """Avanza el reloj los segundos indicados; nunca se interrumpe."""
+        self.waits.append(seconds)
+        self.now += seconds
+        return False
+
+
+
+class FakeThread:
+    """Sustituto ligero de threading.Thread que no lanza ningún hilo."""
+    
+    def __init__(self, target=None, daemon=None, **kwargs):
+        self.target = target
+        self.daemon = daemon
+        self.started = False
+        self.alive = False
+        self.join_timeout = None
+    
+    def start(self) -> None:
+        """Marca el hilo como iniciado."""
+        self.started = True
+    
+    def is_alive(self) -> bool:
+        """Devuelve el estado fijado por el test."""
+        return self.alive
+    
+    def join(self, timeout=None) -> None:
+        """Registra el timeout solicitado sin esperar."""
+        self.join_timeout = timeout
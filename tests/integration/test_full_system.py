@@ -1,39 +1,43 @@
 """Tests de integración para el sistema completo."""
 
 import pytest
-import time
 import threading
-from unittest.mock import Mock, patch
-from pathlib import Path
+from collections import namedtuple
+from unittest.mock import DEFAULT, Mock, patch
 
 from main import SignageSystem
-from config import SystemConfig
+
+
+MockedSystem = namedtuple('MockedSystem', ['system', 'scanner', 'manager', 'player'])
+
+
+@pytest.fixture
+def mocked_system(test_config, mock_components, inline_executor):
+    """SignageSystem con escáner, gestor de playlist y reproductor simulados."""
+    with patch.multiple('main', VideoScanner=DEFAULT, PlaylistManager=DEFAULT,
+                        VideoPlayer=DEFAULT) as mocks:
+        mocks['VideoScanner'].return_value = mock_components['scanner']
+        mocks['PlaylistManager'].return_value = mock_components['manager']
+        mocks['VideoPlayer'].return_value = mock_components['player']
+        
+        yield MockedSystem(
+            SignageSystem(test_config, executor=inline_executor),
+            mock_components['scanner'],
+            mock_components['manager'],
+            mock_components['player']
+        )
 
 
 class TestFullSystemIntegration:
     """Tests de integración para el sistema completo."""
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_full_system_initialization(self, mock_scanner, mock_manager, mock_player, 
-                                       test_config, sample_video_files):
+    def test_full_system_initialization(self, mocked_system, sample_video_files):
         """Test inicialización completa del sistema."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        system, mock_scanner_instance, mock_manager_instance, mock_player_instance = mocked_system
         mock_manager_instance.load_videos_from_directory.return_value = len(sample_video_files)
         mock_manager_instance.is_empty.return_value = False
-        mock_manager.return_value = mock_manager_instance
-        
-        mock_player_instance = Mock()
-        mock_player.return_value = mock_player_instance
         
         # Test inicialización
-        system = SignageSystem(test_config)
         result = system.initialize()
         
         assert result is True
@@ -48,24 +52,19 @@ class TestFullSystemIntegration:
         mock_player_instance.set_on_error_callback.assert_called_once()
         mock_scanner_instance.start_monitoring.assert_called_once()
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_system_start_and_stop(self, mock_scanner, mock_manager, mock_player, test_config):
+    def test_system_start_and_stop(self, mocked_system):
         """Test inicio y parada del sistema."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        system, mock_scanner_instance, mock_manager_instance, mock_player_instance = mocked_system
         mock_manager_instance.load_videos_from_directory.return_value = 3
-        mock_manager.return_value = mock_manager_instance
         
-        mock_player_instance = Mock()
-        mock_player.return_value = mock_player_instance
+        # El bucle principal consulta la playlist nada más arrancar
+        loop_started = threading.Event()
+        
+        def is_empty():
+            loop_started.set()
+            return True
         
-        system = SignageSystem(test_config)
+        mock_manager_instance.is_empty.side_effect = is_empty
         
         # Test inicio
         result = system.start()
@@ -73,8 +72,8 @@ class TestFullSystemIntegration:
         assert system._running is True
         assert system._main_thread is not None
         
-        # Esperar un poco para que el thread se inicie
-        time.sleep(0.1)
+        # Esperar a que el thread entre en el bucle principal
+        assert loop_started.wait(timeout=2.0)
         
         # Test parada
         system.stop()
@@ -84,30 +83,17 @@ class TestFullSystemIntegration:
         mock_player_instance.cleanup.assert_called_once()
         mock_scanner_instance.cleanup.assert_called_once()
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_video_playback_cycle(self, mock_scanner, mock_manager, mock_player, 
-                                 test_config, sample_video_info):
+    def test_video_playback_cycle(self, mocked_system, sample_videos):
         """Test ciclo completo de reproducción de videos."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
-        mock_manager_instance.load_videos_from_directory.return_value = len(sample_video_info)
+        system, _, mock_manager_instance, mock_player_instance = mocked_system
+        mock_manager_instance.load_videos_from_directory.return_value = sample_videos.count
         mock_manager_instance.is_empty.return_value = False
-        mock_manager_instance.get_current_video.return_value = sample_video_info[0]
-        mock_manager_instance.get_next_video.return_value = sample_video_info[1]
-        mock_manager.return_value = mock_manager_instance
+        mock_manager_instance.get_current_video.return_value = sample_videos.items[0]
+        mock_manager_instance.get_next_video.return_value = sample_videos.items[1]
         
-        mock_player_instance = Mock()
         mock_player_instance.play_video.return_value = True
-        mock_player_instance.is_playing.side_effect = [True, True, False]  # Simular reproducción
-        mock_player.return_value = mock_player_instance
+        mock_player_instance.is_playing.side_effect = iter((True, True, False))  # Simular reproducción
         
-        system = SignageSystem(test_config)
         system.initialize()
         
         # Simular un ciclo del bucle principal
@@ -125,27 +111,16 @@ class TestFullSystemIntegration:
         mock_manager_instance.get_current_video.assert_called()
         mock_player_instance.play_video.assert_called_once()
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_error_handling_and_recovery(self, mock_scanner, mock_manager, mock_player, test_config):
+    def test_error_handling_and_recovery(self, mocked_system, fake_clock):
         """Test manejo de errores y recuperación."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        system, _, mock_manager_instance, mock_player_instance = mocked_system
         mock_manager_instance.load_videos_from_directory.return_value = 1
         mock_manager_instance.is_empty.return_value = False
         mock_manager_instance.get_current_video.return_value = Mock(filename='test.mp4', file_path='/test.mp4')
-        mock_manager.return_value = mock_manager_instance
         
-        mock_player_instance = Mock()
         mock_player_instance.play_video.return_value = False  # Simular error
-        mock_player.return_value = mock_player_instance
         
-        system = SignageSystem(test_config)
+        system._wait = fake_clock.wait
         system.initialize()
         
         initial_error_count = system._error_count
@@ -157,61 +132,33 @@ class TestFullSystemIntegration:
         assert system._error_count == initial_error_count + 1
         assert system._consecutive_errors == initial_consecutive_errors + 1
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_directory_change_handling(self, mock_scanner, mock_manager, mock_player, test_config):
+    def test_directory_change_handling(self, mocked_system):
         """Test manejo de cambios en el directorio."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        system, _, mock_manager_instance, _ = mocked_system
         mock_manager_instance.load_videos_from_directory.return_value = 2
-        mock_manager.return_value = mock_manager_instance
-        
-        mock_player_instance = Mock()
-        mock_player.return_value = mock_player_instance
         
-        system = SignageSystem(test_config)
         system.initialize()
         
         # Simular cambio en directorio
         change_info = {'type': 'created', 'path': '/new_video.mp4'}
         
-        with patch('threading.Thread') as mock_thread:
-            mock_thread_instance = Mock()
-            mock_thread.return_value = mock_thread_instance
-            
+        with patch.object(system, '_refresh_playlist') as mock_refresh:
             system._on_directory_change(change_info)
             
-            # Verificar que se creó un thread para actualizar la playlist
-            mock_thread.assert_called_once()
-            mock_thread_instance.start.assert_called_once()
+            # El ejecutor síncrono actualiza la playlist en el acto
+            mock_refresh.assert_called_once()
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_system_status_reporting(self, mock_scanner, mock_manager, mock_player, test_config):
+    def test_system_status_reporting(self, mocked_system):
         """Test reporte de estado del sistema."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
+        system, mock_scanner_instance, mock_manager_instance, mock_player_instance = mocked_system
         mock_scanner_instance.get_directory_info.return_value = {'path': '/videos', 'count': 3}
-        mock_scanner.return_value = mock_scanner_instance
         
-        mock_manager_instance = Mock()
         mock_manager_instance.load_videos_from_directory.return_value = 3
         mock_manager_instance.get_playlist_info.return_value = {'total': 3, 'current': 1}
-        mock_manager.return_value = mock_manager_instance
         
-        mock_player_instance = Mock()
         mock_player_instance.get_current_video.return_value = 'current_video.mp4'
         mock_player_instance.is_playing.return_value = True
-        mock_player.return_value = mock_player_instance
         
-        system = SignageSystem(test_config)
         system.initialize()
         system._running = True
         system._error_count = 2
@@ -237,24 +184,12 @@ class TestFullSystemIntegration:
         assert status['playlist_info'] == {'total': 3, 'current': 1}
         assert status['directory_info'] == {'path': '/videos', 'count': 3}
     
-    @patch('main.VideoPlayer')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoScanner')
-    def test_max_retries_recovery(self, mock_scanner, mock_manager, mock_player, test_config):
+    def test_max_retries_recovery(self, mocked_system, fake_clock, test_config):
         """Test recuperación después de alcanzar reintentos máximos."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        system, _, mock_manager_instance, _ = mocked_system
         mock_manager_instance.load_videos_from_directory.return_value = 1
-        mock_manager.return_value = mock_manager_instance
         
-        mock_player_instance = Mock()
-        mock_player.return_value = mock_player_instance
-        
-        system = SignageSystem(test_config)
+        system._wait = fake_clock.wait
         system.initialize()
         
         # Simular errores consecutivos hasta alcanzar el máximo
@@ -286,6 +221,24 @@ class TestFullSystemIntegration:
         for video_file in sample_video_files:
             assert str(video_file) in videos
     
+    def test_dotfile_is_not_a_video(self, test_config, sample_video_files):
+        """Test que escáner, vigilante y playlist rechazan igual un archivo '.mp4'."""
+        from video_scanner import VideoScanner, VideoFileHandler
+        from playlist_manager import PlaylistManager
+        
+        dotfile = test_config.video_dir / ".mp4"
+        dotfile.write_bytes(b"hidden")
+        
+        scanner = VideoScanner(test_config)
+        handler = VideoFileHandler(test_config.supported_formats_pattern)
+        manager = PlaylistManager(test_config)
+        manager.load_videos_from_directory()
+        
+        assert str(dotfile) not in scanner.scan_videos()
+        assert handler._is_video_file(str(dotfile)) is False
+        assert ".mp4" not in manager.get_video_list()
+        assert manager.add_video(str(dotfile)) is False
+    
     def test_config_validation_integration(self, temp_dir):
         """Test integración de validación de configuración."""
         from config import SystemConfig, VLCConfig
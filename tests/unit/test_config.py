@@ -1,10 +1,15 @@
 """Tests unitarios para modelos de configuración."""
 
+import os
 import pytest
 from pathlib import Path
+from unittest.mock import Mock, patch
 from pydantic import ValidationError
 
-from config import SystemConfig, VLCConfig, VideoInfo, Playlist, PlayerState
+from config import (
+    SystemConfig, VLCConfig, VideoInfo, Playlist, PlayerState,
+    scan_video_dir
+)
 
 
 class TestSystemConfig:
@@ -16,15 +21,17 @@ class TestSystemConfig:
         
         assert config.video_dir == Path('/home/pi/kdx-pi-signage/videos')
         assert config.log_dir == Path('/home/pi/kdx-pi-signage/logs')
-        assert config.supported_formats == ['.mp4', '.avi', '.mkv', '.mov', '.wmv']
+        assert config.supported_formats == ('.mp4', '.avi', '.mkv', '.mov', '.wmv')
         assert config.refresh_interval == 30
         assert config.max_retries == 3
         assert config.retry_delay == 5
+        assert config.polling_observer is False
+        assert config.polling_interval == 30
     
-    def test_custom_values(self, temp_dir):
+    def test_custom_values(self, shared_config_dirs):
         """Test valores personalizados de SystemConfig."""
-        video_dir = temp_dir / "custom_videos"
-        log_dir = temp_dir / "custom_logs"
+        video_dir = shared_config_dirs['video_dir']
+        log_dir = shared_config_dirs['log_dir']
         
         config = SystemConfig(
             video_dir=video_dir,
@@ -37,7 +44,7 @@ class TestSystemConfig:
         
         assert config.video_dir == video_dir
         assert config.log_dir == log_dir
-        assert config.supported_formats == ['.mp4', '.avi']
+        assert config.supported_formats == ('.mp4', '.avi')
         assert config.refresh_interval == 60
         assert config.max_retries == 5
         assert config.retry_delay == 10
@@ -57,67 +64,98 @@ class TestSystemConfig:
         assert config.video_dir.exists()
         assert config.log_dir.exists()
     
-    def test_validate_directories_string_input(self, temp_dir):
+    def test_validate_directories_string_input(self, temp_dir, shared_config_dirs):
         """Test validación de directorios con entrada string."""
         video_dir_str = str(temp_dir / "string_videos")
         
-        config = SystemConfig(video_dir=video_dir_str)
+        config = SystemConfig(video_dir=video_dir_str, log_dir=shared_config_dirs['log_dir'])
         
         assert isinstance(config.video_dir, Path)
         assert config.video_dir.exists()
     
-    def test_validate_formats_valid(self):
+    def test_validate_formats_valid(self, shared_config_dirs):
         """Test validación de formatos válidos."""
-        config = SystemConfig(supported_formats=['.mp4', '.avi', '.mkv'])
+        config = SystemConfig(supported_formats=['.mp4', '.avi', '.mkv'], **shared_config_dirs)
         
-        assert config.supported_formats == ['.mp4', '.avi', '.mkv']
+        assert config.supported_formats == ('.mp4', '.avi', '.mkv')
+        assert config.supported_formats_set == frozenset({'.mp4', '.avi', '.mkv'})
     
-    def test_validate_formats_invalid(self):
-        """Test validación de formatos inválidos."""
-        with pytest.raises(ValidationError, match="Formato debe comenzar con punto"):
-            SystemConfig(supported_formats=['mp4', '.avi'])
+    def test_supported_formats_set_lowercase(self, shared_config_dirs):
+        """Test que el conjunto de formatos se normaliza a minúsculas."""
+        config = SystemConfig(supported_formats=['.MP4', '.Avi'], **shared_config_dirs)
+        
+        assert config.supported_formats == ('.MP4', '.Avi')
+        assert config.supported_formats_set == frozenset({'.mp4', '.avi'})
     
-    def test_refresh_interval_validation(self):
-        """Test validación de intervalo de refresco."""
-        # Valor válido
-        config = SystemConfig(refresh_interval=60)
-        assert config.refresh_interval == 60
+    def test_supported_formats_set_follows_assignment(self, shared_config_dirs):
+        """Test que el conjunto en minúsculas se recalcula al reasignar supported_formats."""
+        config = SystemConfig(**shared_config_dirs)
         
-        # Valor muy bajo
-        with pytest.raises(ValidationError):
-            SystemConfig(refresh_interval=1)
+        config.supported_formats = ('.WEBM',)
         
-        # Valor muy alto
-        with pytest.raises(ValidationError):
-            SystemConfig(refresh_interval=500)
+        assert config.supported_formats_set == frozenset({'.webm'})
     
-    def test_max_retries_validation(self):
-        """Test validación de reintentos máximos."""
-        # Valor válido
-        config = SystemConfig(max_retries=5)
-        assert config.max_retries == 5
+    def test_supported_formats_pattern_follows_assignment(self, shared_config_dirs):
+        """Test que el patrón se recalcula al reasignar supported_formats."""
+        config = SystemConfig(**shared_config_dirs)
         
-        # Valor muy bajo
-        with pytest.raises(ValidationError):
-            SystemConfig(max_retries=0)
+        config.supported_formats = ('.webm',)
         
-        # Valor muy alto
-        with pytest.raises(ValidationError):
-            SystemConfig(max_retries=15)
+        assert config.supported_formats_pattern.search('clip.webm')
+        assert not config.supported_formats_pattern.search('clip.mp4')
+    
+    def test_supported_formats_pattern(self, shared_config_dirs):
+        """Test que el patrón de formatos reconoce extensiones sin distinguir mayúsculas."""
+        config = SystemConfig(supported_formats=['.mp4', '.MKV'], **shared_config_dirs)
+        pattern = config.supported_formats_pattern
+        
+        assert pattern.search('video.MP4').group('ext') == '.MP4'
+        assert pattern.search('video.mkv')
+        assert not pattern.search('video.mp4.txt')
+        assert not pattern.search('videomp4')
+        assert not pattern.search('video.mp4\n')
     
-    def test_retry_delay_validation(self):
-        """Test validación de delay de reintentos."""
+    @pytest.mark.parametrize("name", [
+        'video.mp4', '.hidden.mp4', 'a..mp4', 'clip.tar.MKV',
+        '.mp4', '..mp4', 'videomp4', 'video.mp4.txt', 'video.mp4\n',
+        '/videos/.mp4', '/videos/video.mp4', '/videos.mp4/clip',
+    ])
+    def test_supported_formats_pattern_matches_splitext(self, shared_config_dirs, name):
+        """Test que el patrón acepta exactamente lo que acepta splitext."""
+        config = SystemConfig(supported_formats=['.mp4', '.mkv'], **shared_config_dirs)
+        match = config.supported_formats_pattern.search(name)
+        ext = os.path.splitext(name)[1].lower()
+        
+        if ext in config.supported_formats_set:
+            assert match is not None
+            assert match.group('ext').lower() == ext
+        else:
+            assert match is None
+    
+    def test_validate_formats_invalid(self, shared_config_dirs):
+        """Test validación de formatos inválidos."""
+        with pytest.raises(ValidationError, match="Formato debe comenzar con punto"):
+            SystemConfig(supported_formats=['mp4', '.avi'], **shared_config_dirs)
+    
+    @pytest.mark.parametrize("field,low,high,valid", [
+        ("refresh_interval", 1, 500, 60),
+        ("max_retries", 0, 15, 5),
+        ("retry_delay", 0, 100, 10),
+        ("polling_interval", 0, 500, 60),
+    ])
+    def test_numeric_bounds(self, field, low, high, valid, shared_config_dirs):
+        """Test validación de rangos de los campos numéricos."""
         # Valor válido
-        config = SystemConfig(retry_delay=10)
-        assert config.retry_delay == 10
+        config = SystemConfig(**{field: valid}, **shared_config_dirs)
+        assert getattr(config, field) == valid
         
         # Valor muy bajo
         with pytest.raises(ValidationError):
-            SystemConfig(retry_delay=0)
+            SystemConfig(**{field: low}, **shared_config_dirs)
         
         # Valor muy alto
         with pytest.raises(ValidationError):
-            SystemConfig(retry_delay=100)
+            SystemConfig(**{field: high}, **shared_config_dirs)
 
 
 class TestVLCConfig:
@@ -194,14 +232,33 @@ class TestVLCConfig:
         ]
         
         assert args == expected_args
+    
+    def test_to_vlc_args_cached(self):
+        """Test que los argumentos se precalculan y cada llamada devuelve una copia."""
+        config = VLCConfig()
+        
+        assert isinstance(config._vlc_args, tuple)
+        
+        first = config.to_vlc_args()
+        first.append('--extra')
+        
+        assert config.to_vlc_args() == list(config._vlc_args)
+        assert config.to_vlc_args() == first[:-1]
+    
+    def test_frozen(self):
+        """Test que VLCConfig no admite modificaciones."""
+        config = VLCConfig()
+        
+        with pytest.raises(ValidationError):
+            config.fullscreen = False
 
 
 class TestVideoInfo:
     """Tests para VideoInfo."""
     
-    def test_valid_video_info(self, sample_video_files):
+    def test_valid_video_info(self, sample_video_files_ro):
         """Test creación de VideoInfo válido."""
-        video_file = sample_video_files[0]
+        video_file = sample_video_files_ro[0]
         
         video_info = VideoInfo(
             file_path=video_file,
@@ -212,15 +269,24 @@ class TestVideoInfo:
             last_modified=video_file.stat().st_mtime
         )
         
-        assert video_info.file_path == video_file
+        assert video_info.file_path == str(video_file)
         assert video_info.filename == video_file.name
         assert video_info.file_size > 0
         assert video_info.format_extension == video_file.suffix
         assert video_info.is_valid is True
     
-    def test_validate_file_exists(self, sample_video_files):
+    def test_video_info_is_frozen(self, sample_video_info):
+        """Test que VideoInfo no admite modificaciones tras su creación."""
+        video_info = sample_video_info[0]
+        
+        with pytest.raises(ValidationError):
+            video_info.file_size = 0
+        
+        assert hash(video_info) == hash(video_info)
+    
+    def test_validate_file_exists(self, sample_video_files_ro):
         """Test validación de archivo existente."""
-        video_file = sample_video_files[0]
+        video_file = sample_video_files_ro[0]
         
         # Debería funcionar sin problemas
         video_info = VideoInfo(
@@ -230,56 +296,87 @@ class TestVideoInfo:
             format_extension='.mp4'
         )
         
-        assert video_info.file_path == video_file
-    
-    def test_validate_file_not_exists(self):
-        """Test validación de archivo inexistente."""
-        with pytest.raises(ValidationError, match="Archivo no encontrado"):
-            VideoInfo(
-                file_path=Path('/nonexistent/video.mp4'),
-                filename='video.mp4',
-                file_size=100,
-                format_extension='.mp4'
-            )
+        assert video_info.file_path == str(video_file)
     
-    def test_extract_filename_from_path(self, sample_video_files):
-        """Test extracción automática de filename."""
-        video_file = sample_video_files[0]
-        
+    def test_file_path_stored_as_str(self):
+        """Test que file_path se guarda como str sin verificar el disco."""
         video_info = VideoInfo(
-            file_path=video_file,
-            filename='',  # Será extraído automáticamente
+            file_path=Path('/nonexistent/video.mp4'),
+            filename='video.mp4',
             file_size=100,
             format_extension='.mp4'
         )
         
-        assert video_info.filename == video_file.name
-    
-    def test_extract_extension_from_path(self, sample_video_files):
-        """Test extracción automática de extensión."""
-        video_file = sample_video_files[0]
-        
-        video_info = VideoInfo(
+        assert video_info.file_path == '/nonexistent/video.mp4'
+        assert isinstance(video_info.file_path, str)
+    
+    @pytest.mark.parametrize("blank_field,blank_value,expected", [
+        ('filename', '', lambda f: f.name),
+        ('format_extension', '', lambda f: f.suffix.lower()),
+    ], ids=['filename', 'extension'])
+    def test_auto_extraction(self, sample_video_files_ro, blank_field, blank_value, expected):
+        """Test extracción automática de campos vacíos a partir de la ruta."""
+        video_file = sample_video_files_ro[0]
+        kwargs = dict(
             file_path=video_file,
             filename=video_file.name,
             file_size=100,
-            format_extension=''  # Será extraído automáticamente
+            format_extension='.mp4'
         )
+        kwargs[blank_field] = blank_value  # Será extraído automáticamente
         
-        assert video_info.format_extension == video_file.suffix.lower()
+        video_info = VideoInfo(**kwargs)
+        
+        assert getattr(video_info, blank_field) == expected(video_file)
     
-    def test_get_file_size_automatic(self, sample_video_files):
-        """Test obtención automática de tamaño de archivo."""
-        video_file = sample_video_files[0]
+    def test_construction_does_not_stat(self, monkeypatch):
+        """Test que la construcción directa no consulta el sistema de archivos."""
+        def fail_stat(*args, **kwargs):
+            raise AssertionError("os.stat no debería llamarse")
+        
+        monkeypatch.setattr(os, 'stat', fail_stat)
         
         video_info = VideoInfo(
-            file_path=video_file,
-            filename=video_file.name,
-            file_size=0,  # Será calculado automáticamente
-            format_extension='.mp4'
+            file_path='/videos/empty.mp4',
+            filename='empty.mp4',
+            file_size=0,
+            format_extension='.mp4',
+            last_modified=None
         )
         
-        assert video_info.file_size == video_file.stat().st_size
+        assert video_info.file_size == 0
+        assert video_info.last_modified is None
+    
+    def test_from_path(self, sample_video_files_ro):
+        """Test construcción de VideoInfo desde una ruta con un único stat."""
+        video_file = sample_video_files_ro[1]
+        st = video_file.stat()
+        
+        video_info = VideoInfo.from_path(video_file)
+        
+        assert video_info.file_path == str(video_file)
+        assert video_info.filename == video_file.name
+        assert video_info.file_size == st.st_size
+        assert video_info.format_extension == video_file.suffix.lower()
+        assert video_info.last_modified == st.st_mtime
+    
+    def test_from_path_not_exists(self):
+        """Test from_path con archivo inexistente."""
+        with pytest.raises(ValueError, match="Archivo no encontrado"):
+            VideoInfo.from_path(Path('/nonexistent/video.mp4'))
+    
+    def test_fast_build_skips_validation(self, sample_video_files_ro):
+        """Test que fast_build confía en el stat recibido sin revalidar."""
+        st = sample_video_files_ro[0].stat()
+        video_file = '/nonexistent/VIDEO.MP4'
+        
+        video_info = VideoInfo.fast_build(video_file, st)
+        
+        assert video_info.file_path == video_file
+        assert video_info.filename == 'VIDEO.MP4'
+        assert video_info.format_extension == '.mp4'
+        assert video_info.file_size == st.st_size
+        assert video_info.is_valid is True
 
 
 class TestPlaylist:
@@ -308,6 +405,12 @@ class TestPlaylist:
         assert playlist.shuffle_enabled is True
         assert playlist.loop_enabled is False
     
+    def test_videos_not_copied(self, sample_video_info):
+        """Test que Playlist conserva las instancias de VideoInfo sin copiarlas."""
+        playlist = Playlist(videos=sample_video_info)
+        
+        assert all(a is b for a, b in zip(playlist.videos, sample_video_info))
+    
     def test_validate_index_in_range(self, sample_video_info):
         """Test validación de índice dentro del rango."""
         playlist = Playlist(
@@ -355,42 +458,29 @@ class TestPlaylist:
         
         assert result is None
     
-    def test_get_next_video_with_loop(self, sample_video_info):
-        """Test obtener siguiente video con bucle."""
+    @pytest.mark.parametrize("start_idx,loop,expected_next_idx", [
+        (0, True, 1),
+        (0, False, 1),
+        (-1, True, 0),      # Último video: vuelve al primero con bucle
+        (-1, False, None),  # Último video: termina sin bucle
+    ])
+    def test_get_next_video_transitions(self, sample_video_info, start_idx, loop, expected_next_idx):
+        """Test transiciones al siguiente video con y sin bucle."""
+        start = start_idx % len(sample_video_info)
         playlist = Playlist(
             videos=sample_video_info,
-            current_index=len(sample_video_info) - 1,  # Último video
-            loop_enabled=True
+            current_index=start,
+            loop_enabled=loop
         )
         
         result = playlist.get_next_video()
         
-        assert result == sample_video_info[0]  # Debería volver al primero
-        assert playlist.current_index == 0
-    
-    def test_get_next_video_without_loop(self, sample_video_info):
-        """Test obtener siguiente video sin bucle."""
-        playlist = Playlist(
-            videos=sample_video_info,
-            current_index=len(sample_video_info) - 1,  # Último video
-            loop_enabled=False
-        )
-        
-        result = playlist.get_next_video()
-        
-        assert result is None
-    
-    def test_get_next_video_normal_sequence(self, sample_video_info):
-        """Test obtener siguiente video en secuencia normal."""
-        playlist = Playlist(
-            videos=sample_video_info,
-            current_index=0
-        )
-        
-        result = playlist.get_next_video()
-        
-        assert result == sample_video_info[1]
-        assert playlist.current_index == 1
+        if expected_next_idx is None:
+            assert result is None
+            assert playlist.current_index == start
+        else:
+            assert result == sample_video_info[expected_next_idx]
+            assert playlist.current_index == expected_next_idx
     
     def test_reset_playlist(self, sample_video_info):
         """Test reset de playlist."""
@@ -430,10 +520,10 @@ class TestPlayerState:
         assert state.playback_errors == 0
         assert state.last_scan_time is None
     
-    def test_custom_values(self, sample_video_files):
+    def test_custom_values(self, sample_video_files_ro):
         """Test valores personalizados de PlayerState."""
         # Usar un archivo de video real de las fixtures
-        video_file = sample_video_files[0]
+        video_file = sample_video_files_ro[0]
         
         state = PlayerState(
             current_video=str(video_file),
@@ -451,18 +541,19 @@ class TestPlayerState:
         assert state.playback_errors == 1
         assert state.last_scan_time == 1234567890.0
     
-    def test_validate_video_path_exists(self, sample_video_files):
+    def test_validate_video_path_exists(self, sample_video_files_ro):
         """Test validación de ruta de video existente."""
-        video_file = sample_video_files[0]
+        video_file = sample_video_files_ro[0]
         
         state = PlayerState(current_video=str(video_file))
         
         assert state.current_video == str(video_file)
     
-    def test_validate_video_path_not_exists(self):
-        """Test validación de ruta de video inexistente."""
-        with pytest.raises(ValidationError, match="Archivo de video no encontrado"):
-            PlayerState(current_video='/nonexistent/video.mp4')
+    def test_video_path_not_checked_on_creation(self):
+        """Test que la ruta de video no se verifica en disco al crear el estado."""
+        state = PlayerState(current_video='/nonexistent/video.mp4')
+        
+        assert state.current_video == '/nonexistent/video.mp4'
     
     def test_validate_negative_values(self):
         """Test validación de valores negativos."""
@@ -476,4 +567,68 @@ class TestPlayerState:
         
         # playback_errors negativo
         with pytest.raises(ValidationError):
-            PlayerState(playback_errors=-1)
\ No newline at end of file
+            PlayerState(playback_errors=-1)
+
+
+class TestScanVideoDir:
+    """Tests para scan_video_dir."""
+    
+    def test_scan_video_dir_filters_formats(self, video_dir, sample_video_files):
+        """Test que solo se generan los formatos soportados."""
+        result = list(scan_video_dir(video_dir, ['.mp4', '.avi', '.mkv']))
+        
+        assert sorted(v.file_path for v in result) == sorted(map(str, sample_video_files))
+        for video_info in result:
+            assert video_info.file_size == Path(video_info.file_path).stat().st_size
+            assert video_info.format_extension == Path(video_info.file_path).suffix.lower()
+    
+    def test_scan_video_dir_single_stat_per_video(self, video_dir, sample_video_files):
+        """Test que tamaño y fecha de modificación salen del stat de la entrada."""
+        with patch('os.stat', side_effect=os.stat) as mock_stat:
+            result = list(scan_video_dir(video_dir, ['.mp4', '.avi', '.mkv']))
+        
+        mock_stat.assert_not_called()
+        for video_info in result:
+            st = os.stat(video_info.file_path)
+            assert video_info.file_size == st.st_size
+            assert video_info.last_modified == st.st_mtime
+    
+    def test_scan_video_dir_parallel_matches_sequential(self, video_dir, sample_video_files):
+        """Test que el escaneo paralelo genera los mismos videos."""
+        formats = ['.mp4', '.avi', '.mkv']
+        
+        sequential = list(scan_video_dir(video_dir, formats))
+        parallel = list(scan_video_dir(video_dir, formats, parallel=True))
+        
+        assert sorted(v.file_path for v in parallel) == sorted(v.file_path for v in sequential)
+        assert len(parallel) == len(sample_video_files)
+    
+    def test_scan_video_dir_skips_directories(self, video_dir):
+        """Test que los directorios con extensión de video se ignoran."""
+        (video_dir / "folder.mp4").mkdir()
+        
+        assert list(scan_video_dir(video_dir, ['.mp4'])) == []
+    
+    def test_scan_video_dir_warns_on_unreadable_file(self, video_dir, monkeypatch):
+        """Test que un video que falla al consultarse se omite con un aviso."""
+        (video_dir / "broken.mp4").write_bytes(b"video")
+        error = OSError("stat falló")
+        monkeypatch.setattr(VideoInfo, 'from_dirent', Mock(side_effect=error))
+        mock_logger = Mock()
+        monkeypatch.setattr('config.logger', mock_logger)
+        
+        assert list(scan_video_dir(video_dir, ['.mp4'])) == []
+        
+        mock_logger.warning.assert_called_once_with(
+            "Error al cargar video {}: {}", str(video_dir / "broken.mp4"), error
+        )
+    
+    def test_scan_video_dir_skips_dotfiles(self, video_dir):
+        """Test que un archivo oculto llamado como una extensión no es un video."""
+        (video_dir / ".mp4").write_bytes(b"hidden")
+        (video_dir / ".clip.mp4").write_bytes(b"video")
+        
+        result = list(scan_video_dir(video_dir, ['.mp4']))
+        
+        assert [v.filename for v in result] == ['.clip.mp4']
+        assert result[0].format_extension == '.mp4'
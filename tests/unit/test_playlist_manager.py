@@ -1,46 +1,87 @@
 """Tests unitarios para PlaylistManager."""
 
 import pytest
-from unittest.mock import Mock, patch
+import random
+from operator import itemgetter
+from unittest.mock import Mock
 from pathlib import Path
 
+import playlist_manager
 from playlist_manager import PlaylistManager, SequentialStrategy, ShuffleStrategy
 from config import VideoInfo, Playlist
 
 
-class TestSequentialStrategy:
-    """Tests para SequentialStrategy."""
+PLAYLIST_INFO_FIELDS = itemgetter(
+    'total_videos', 'current_index', 'current_video',
+    'loop_enabled', 'shuffle_enabled', 'is_empty'
+)
+
+
+@pytest.fixture
+def fake_scan(monkeypatch):
+    """Sustituye el escaneo del directorio por un resultado en memoria.
+    
+    Devuelve una función que recibe la lista de VideoInfo a devolver o
+    la excepción a lanzar.
+    """
+    def install(result):
+        def scan(video_dir, supported_formats, parallel=False):
+            if isinstance(result, BaseException):
+                raise result
+            return iter(result)
+        
+        monkeypatch.setattr(playlist_manager, 'scan_video_dir', scan)
+    
+    return install
+
+
+@pytest.mark.parametrize("strategy_cls", [SequentialStrategy, ShuffleStrategy])
+class TestPlaybackStrategies:
+    """Tests comunes a todas las estrategias de reproducción."""
     
-    def test_get_next_video_empty_playlist(self):
+    def test_get_next_video_empty_playlist(self, strategy_cls):
         """Test obtener siguiente video con playlist vacía."""
-        strategy = SequentialStrategy()
+        strategy = strategy_cls()
         playlist = Playlist(videos=[], current_index=0, loop_enabled=True)
         
         result = strategy.get_next_video(playlist)
         
         assert result is None
     
-    def test_get_next_video_with_loop(self, sample_video_info):
+    def test_reset(self, strategy_cls, sample_playlist):
+        """Test que el reset vuelve al primer video."""
+        strategy = strategy_cls()
+        sample_playlist.current_index = 2
+        
+        strategy.reset(sample_playlist)
+        
+        assert sample_playlist.current_index == 0
+
+
+class TestSequentialStrategy:
+    """Tests para SequentialStrategy."""
+    
+    def test_get_next_video_with_loop(self, sample_videos):
         """Test obtener siguiente video con bucle habilitado."""
         strategy = SequentialStrategy()
         playlist = Playlist(
-            videos=sample_video_info,
-            current_index=len(sample_video_info) - 1,  # Último video
+            videos=sample_videos.items,
+            current_index=sample_videos.last_index,  # Último video
             loop_enabled=True
         )
         
         result = strategy.get_next_video(playlist)
         
         assert result is not None
-        assert result == sample_video_info[0]  # Debe volver al primero
+        assert result == sample_videos.items[0]  # Debe volver al primero
         assert playlist.current_index == 0
     
-    def test_get_next_video_without_loop(self, sample_video_info):
+    def test_get_next_video_without_loop(self, sample_videos):
         """Test obtener siguiente video sin bucle."""
         strategy = SequentialStrategy()
         playlist = Playlist(
-            videos=sample_video_info,
-            current_index=len(sample_video_info) - 1,  # Último video
+            videos=sample_videos.items,
+            current_index=sample_videos.last_index,  # Último video
             loop_enabled=False
         )
         
@@ -62,59 +103,75 @@ class TestSequentialStrategy:
         assert result is not None
         assert result == sample_video_info[1]
         assert playlist.current_index == 1
-    
-    def test_reset(self, sample_playlist):
-        """Test reset de estrategia secuencial."""
-        strategy = SequentialStrategy()
-        sample_playlist.current_index = 2
-        
-        strategy.reset(sample_playlist)
-        
-        assert sample_playlist.current_index == 0
 
 
 class TestShuffleStrategy:
     """Tests para ShuffleStrategy."""
     
-    def test_get_next_video_empty_playlist(self):
-        """Test obtener siguiente video con playlist vacía."""
-        strategy = ShuffleStrategy()
-        playlist = Playlist(videos=[], current_index=0, loop_enabled=True)
-        
-        result = strategy.get_next_video(playlist)
-        
-        assert result is None
-    
-    @patch('random.choice')
-    def test_get_next_video_random_selection(self, mock_choice, sample_video_info):
+    def test_get_next_video_random_selection(self, sample_video_info):
         """Test selección aleatoria de video."""
-        strategy = ShuffleStrategy()
+        rng = Mock(spec=random.Random)
+        strategy = ShuffleStrategy(rng=rng)
         playlist = Playlist(
             videos=sample_video_info,
             current_index=0,
             loop_enabled=True
         )
         
-        # Mock para que siempre seleccione el segundo video
-        mock_choice.return_value = 1
+        # Generador simulado para que el orden barajado empiece por el segundo video
+        rng.shuffle.side_effect = lambda order: order.sort(key=lambda i: i != 1)
         
         result = strategy.get_next_video(playlist)
         
         assert result == sample_video_info[1]
         assert playlist.current_index == 1
-        mock_choice.assert_called_once()
+        rng.shuffle.assert_called_once()
+    
+    def test_get_next_video_plays_each_video_once_per_cycle(self, sample_video_info):
+        """Test que un ciclo reproduce cada video una vez y termina sin bucle."""
+        strategy = ShuffleStrategy(rng=random.Random(42))
+        playlist = Playlist(
+            videos=sample_video_info,
+            current_index=0,
+            loop_enabled=False
+        )
+        
+        played = [strategy.get_next_video(playlist) for _ in sample_video_info]
+        
+        assert sorted(v.filename for v in played) == sorted(v.filename for v in sample_video_info)
+        assert strategy.get_next_video(playlist) is None
+    
+    def test_get_next_video_no_repeat_between_cycles(self, sample_video_info):
+        """Test que el primer video de un ciclo no repite el último del anterior."""
+        rng = Mock(spec=random.Random)
+        strategy = ShuffleStrategy(rng=rng)
+        playlist = Playlist(
+            videos=sample_video_info,
+            current_index=0,
+            loop_enabled=True
+        )
+        
+        # Forzar que cada ciclo empiece por el último video reproducido
+        rng.shuffle.side_effect = lambda order: order.sort(
+            key=lambda i: i != strategy._last_index
+        )
+        
+        for _ in sample_video_info:
+            last = strategy.get_next_video(playlist)
+        
+        assert strategy.get_next_video(playlist) is not last
     
-    def test_reset(self, sample_playlist):
-        """Test reset de estrategia shuffle."""
+    def test_reset_clears_cycle(self, sample_playlist):
+        """Test que el reset descarta el ciclo aleatorio en curso."""
         strategy = ShuffleStrategy()
-        strategy._played_indices = [0, 1]
-        strategy._last_index = 1
-        sample_playlist.current_index = 2
+        strategy._order = [1, 0, 2]
+        strategy._pos = 2
+        strategy._last_index = 0
         
         strategy.reset(sample_playlist)
         
-        assert sample_playlist.current_index == 0
-        assert strategy._played_indices == []
+        assert strategy._order == []
+        assert strategy._pos == 0
         assert strategy._last_index is None
 
 
@@ -130,73 +187,71 @@ class TestPlaylistManager:
         assert manager._playlist is not None
         assert manager._playlist.videos == []
     
-    def test_set_strategy_sequential(self, test_config):
-        """Test cambio a estrategia secuencial."""
+    @pytest.mark.parametrize("modes,expected_strategy", [
+        ((False,), SequentialStrategy),
+        ((True,), ShuffleStrategy),
+        ((True, False), SequentialStrategy),  # Vuelta de shuffle a secuencial
+    ], ids=["sequential", "shuffle", "shuffle-to-sequential"])
+    def test_set_shuffle_mode(self, test_config, modes, expected_strategy):
+        """Test cambio entre modos shuffle y secuencial."""
         manager = PlaylistManager(test_config)
         
-        manager.set_shuffle_mode(False)
+        for mode in modes:
+            manager.set_shuffle_mode(mode)
         
-        # Verificar que el modo shuffle está deshabilitado
-        assert manager._playlist.shuffle_enabled is False
+        assert manager._playlist.shuffle_enabled is modes[-1]
+        assert isinstance(manager._current_strategy, expected_strategy)
     
-    def test_set_strategy_random(self, test_config):
-        """Test cambio a estrategia shuffle."""
+    def test_is_loop_enabled(self, test_config):
+        """Test consulta del modo bucle."""
         manager = PlaylistManager(test_config)
         
-        manager.set_shuffle_mode(True)
-        
-        # Verificar que el modo shuffle está habilitado
-        assert manager._playlist.shuffle_enabled is True
-    
-    def test_set_strategy_shuffle(self, test_config):
-        """Test cambio a estrategia shuffle."""
-        manager = PlaylistManager(test_config)
+        assert manager.is_loop_enabled() is True
         
-        manager.set_shuffle_mode(True)
+        manager.set_loop_mode(False)
         
-        # Verificar que el modo shuffle está habilitado
-        assert manager._playlist.shuffle_enabled is True
+        assert manager.is_loop_enabled() is False
     
-    def test_set_strategy_invalid(self, test_config):
-        """Test cambio entre modos shuffle y secuencial."""
+    def test_load_videos_from_directory_success(self, test_config, sample_videos, fake_scan):
+        """Test carga exitosa de videos desde directorio."""
+        fake_scan(sample_videos.items)
         manager = PlaylistManager(test_config)
-        original_shuffle_mode = manager._playlist.shuffle_enabled
         
-        # Cambiar a shuffle
-        manager.set_shuffle_mode(True)
-        assert manager._playlist.shuffle_enabled is True
+        result = manager.load_videos_from_directory()
         
-        # Cambiar a secuencial
-        manager.set_shuffle_mode(False)
-        assert manager._playlist.shuffle_enabled is False
+        assert result == sample_videos.count
+        assert len(manager._playlist.videos) == sample_videos.count
     
-    def test_load_videos_from_directory_success(self, test_config, sample_video_files):
-        """Test carga exitosa de videos desde directorio."""
+    def test_load_videos_from_directory_sorted_by_name(self, test_config):
+        """Test que los videos se ordenan por nombre sin distinguir mayúsculas."""
+        for name in ['b.mp4', 'C.avi', 'a.mkv']:
+            (test_config.video_dir / name).write_bytes(b"fake video")
         manager = PlaylistManager(test_config)
         
-        result = manager.load_videos_from_directory()
+        manager.load_videos_from_directory()
         
-        assert result == len(sample_video_files)
-        assert len(manager._playlist.videos) == len(sample_video_files)
+        assert manager.get_video_list() == ['a.mkv', 'b.mp4', 'C.avi']
     
-    def test_load_videos_from_directory_no_videos(self, test_config):
+    def test_load_videos_from_directory_no_videos(self, test_config, fake_scan):
         """Test carga cuando no hay videos."""
+        fake_scan([])
         manager = PlaylistManager(test_config)
         
-        # Usar un directorio vacío
-        empty_dir = test_config.video_dir / "empty"
-        empty_dir.mkdir(exist_ok=True)
-        
-        result = manager.load_videos_from_directory(str(empty_dir))
+        result = manager.load_videos_from_directory()
         
         assert result == 0
         assert len(manager._playlist.videos) == 0
     
-    def test_load_videos_from_directory_exception(self, test_config):
-        """Test carga con directorio inexistente."""
+    @pytest.mark.parametrize("error", [
+        FileNotFoundError("/nonexistent/directory"),
+        PermissionError("/restricted/directory"),
+    ], ids=["missing-dir", "permission-denied"])
+    def test_load_videos_from_directory_exception(self, test_config, fake_scan, error):
+        """Test carga cuando el escaneo del directorio falla."""
+        fake_scan(error)
         manager = PlaylistManager(test_config)
         
-        result = manager.load_videos_from_directory("/nonexistent/directory")
+        result = manager.load_videos_from_directory()
         
         assert result == 0
         assert len(manager._playlist.videos) == 0
@@ -247,14 +302,89 @@ class TestPlaylistManager:
         
         assert manager.is_empty() is False
     
-    def test_get_video_count(self, test_config, sample_video_info):
+    def test_get_video_count(self, test_config, sample_videos):
         """Test obtener número de videos."""
         manager = PlaylistManager(test_config)
-        manager._playlist.videos = sample_video_info
+        manager._playlist.videos = sample_videos.items
         
         result = manager.get_video_count()
         
-        assert result == len(sample_video_info)
+        assert result == sample_videos.count
+    
+    def test_remove_video(self, test_config, sample_videos):
+        """Test remover un video de la playlist por su ruta."""
+        manager = PlaylistManager(test_config)
+        manager._playlist.videos = list(sample_videos.items)
+        
+        result = manager.remove_video(sample_videos.items[1].file_path)
+        
+        assert result is True
+        assert manager.get_video_count() == sample_videos.count - 1
+        assert sample_videos.items[1] not in manager._playlist.videos
+    
+    def test_remove_video_keeps_path_index_in_sync(self, test_config, sample_video_files):
+        """Test remociones sucesivas tras cargar y añadir videos."""
+        manager = PlaylistManager(test_config)
+        manager.load_videos_from_directory()
+        paths = [v.file_path for v in manager._playlist.videos]
+        
+        extra_video = test_config.video_dir / "zz_extra.mp4"
+        extra_video.write_bytes(b"fake video")
+        assert manager.add_video(str(extra_video)) is True
+        
+        assert manager.remove_video(paths[0]) is True
+        assert manager.remove_video(str(extra_video)) is True
+        assert manager.remove_video(paths[-1]) is True
+        
+        assert [v.file_path for v in manager._playlist.videos] == paths[1:-1]
+        assert manager._get_path_index() == {p: i for i, p in enumerate(paths[1:-1])}
+        assert manager.get_video_list() == [Path(p).name for p in paths[1:-1]]
+    
+    def test_add_video_keeps_name_order(self, test_config, sample_video_files):
+        """Test que add_video inserta en orden y conserva el video actual."""
+        manager = PlaylistManager(test_config)
+        manager.load_videos_from_directory()
+        manager._playlist.current_index = 1
+        current = manager.get_current_video()
+        
+        new_video = test_config.video_dir / "a_first.mp4"
+        new_video.write_bytes(b"fake video")
+        
+        assert manager.add_video(str(new_video)) is True
+        
+        assert manager.get_video_list()[0] == "a_first.mp4"
+        assert manager.get_current_video() == current
+        assert manager._get_path_index()[str(new_video)] == 0
+    
+    def test_add_video_not_found(self, test_config):
+        """Test añadir un video inexistente."""
+        manager = PlaylistManager(test_config)
+        
+        result = manager.add_video(str(test_config.video_dir / "missing.mp4"))
+        
+        assert result is False
+        assert manager.is_empty()
+    
+    def test_add_video_unsupported_format(self, test_config):
+        """Test añadir un archivo con formato no soportado."""
+        manager = PlaylistManager(test_config)
+        text_file = test_config.video_dir / "notes.txt"
+        text_file.write_bytes(b"not a video")
+        
+        result = manager.add_video(str(text_file))
+        
+        assert result is False
+        assert manager.is_empty()
+    
+    def test_remove_video_not_found(self, test_config, sample_videos):
+        """Test remover un video que no está en la playlist."""
+        manager = PlaylistManager(test_config)
+        manager._playlist.videos = list(sample_videos.items)
+        
+        result = manager.remove_video('/nonexistent/video.mp4')
+        
+        assert result is False
+        assert manager.get_video_count() == sample_videos.count
     
     def test_reset_playlist(self, test_config, sample_video_info):
         """Test reset de playlist."""
@@ -267,40 +397,24 @@ class TestPlaylistManager:
         # El reset debería haber puesto el índice en 0
         assert manager._playlist.current_index == 0
     
-    def test_get_playlist_info(self, test_config, sample_video_info):
-        """Test obtener información de playlist."""
+    @pytest.mark.parametrize("with_videos,current_index", [
+        (True, 1),
+        (False, 0),
+    ], ids=["with-videos", "empty"])
+    def test_get_playlist_info(self, test_config, sample_videos, with_videos, current_index):
+        """Test obtener información de playlist, con videos y vacía."""
+        videos = sample_videos.items if with_videos else []
         manager = PlaylistManager(test_config)
-        manager._playlist.videos = sample_video_info
-        manager._playlist.current_index = 1
-        manager._playlist.loop_enabled = True
-        manager._playlist.shuffle_enabled = False
+        manager._playlist.videos = videos
+        manager._playlist.current_index = current_index
         
         result = manager.get_playlist_info()
         
-        expected = {
-            'total_videos': len(sample_video_info),
-            'current_index': 1,
-            'current_video': sample_video_info[1].filename,
-            'loop_enabled': True,
-            'shuffle_enabled': False,
-            'is_empty': False  # Usar el campo real que devuelve la implementación
-        }
-        
-        assert result == expected
-    
-    def test_get_playlist_info_empty(self, test_config):
-        """Test obtener información de playlist vacía."""
-        manager = PlaylistManager(test_config)
-        
-        result = manager.get_playlist_info()
-        
-        expected = {
-            'total_videos': 0,
-            'current_index': 0,
-            'current_video': None,
-            'loop_enabled': True,
-            'shuffle_enabled': False,
-            'is_empty': True  # Usar el campo real que devuelve la implementación
-        }
-        
-        assert result == expected
\ No newline at end of file
+        assert PLAYLIST_INFO_FIELDS(result) == (
+            len(videos),
+            current_index,
+            videos[current_index].filename if videos else None,
+            True,
+            False,
+            not videos
+        )
\ No newline at end of file
@@ -3,16 +3,40 @@
 import pytest
 import threading
 import time
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
 from main import SignageSystem
+from tests.fixtures import FakeThread
 from config import SystemConfig
 
 
 class TestSignageSystem:
     """Tests para la clase SignageSystem."""
     
+    @pytest.fixture
+    def system(self, test_config):
+        """SignageSystem recién creado con la configuración de prueba."""
+        return SignageSystem(test_config)
+    
+    @pytest.fixture
+    def main_mocks(self, monkeypatch, mock_components):
+        """Sustituye las clases de componentes de main por mocks.
+        
+        Cada clase simulada devuelve la instancia correspondiente de
+        mock_components.
+        """
+        mocks = SimpleNamespace(
+            scanner=Mock(return_value=mock_components['scanner']),
+            manager=Mock(return_value=mock_components['manager']),
+            player=Mock(return_value=mock_components['player'])
+        )
+        monkeypatch.setattr('main.VideoScanner', mocks.scanner)
+        monkeypatch.setattr('main.PlaylistManager', mocks.manager)
+        monkeypatch.setattr('main.VideoPlayer', mocks.player)
+        return mocks
+    
     def test_init_with_default_config(self):
         """Test inicialización con configuración por defecto."""
         system = SignageSystem()
@@ -32,25 +56,13 @@ class TestSignageSystem:
         assert system.config == test_config
         assert system.config.video_dir == test_config.video_dir
     
-    @patch('main.VideoScanner')
-    @patch('main.PlaylistManager')
-    @patch('main.VideoPlayer')
-    def test_initialize_success(self, mock_video_player, mock_playlist_manager, 
-                               mock_video_scanner, test_config):
+    def test_initialize_success(self, system, main_mocks):
         """Test inicialización exitosa de componentes."""
-        # Setup mocks
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = True
-        mock_video_scanner.return_value = mock_scanner_instance
-        
-        mock_manager_instance = Mock()
+        mock_scanner_instance = main_mocks.scanner.return_value
+        mock_manager_instance = main_mocks.manager.return_value
         mock_manager_instance.load_videos_from_directory.return_value = 3
-        mock_playlist_manager.return_value = mock_manager_instance
+        mock_player_instance = main_mocks.player.return_value
         
-        mock_player_instance = Mock()
-        mock_video_player.return_value = mock_player_instance
-        
-        system = SignageSystem(test_config)
         result = system.initialize()
         
         assert result is True
@@ -63,31 +75,24 @@ class TestSignageSystem:
         mock_player_instance.set_on_error_callback.assert_called_once()
         mock_scanner_instance.start_monitoring.assert_called_once()
     
-    @patch('main.VideoScanner')
-    def test_initialize_invalid_directory(self, mock_video_scanner, test_config):
+    def test_initialize_invalid_directory(self, system, main_mocks):
         """Test inicialización con directorio inválido."""
-        mock_scanner_instance = Mock()
-        mock_scanner_instance.validate_directory.return_value = False
-        mock_video_scanner.return_value = mock_scanner_instance
+        main_mocks.scanner.return_value.validate_directory.return_value = False
         
-        system = SignageSystem(test_config)
         result = system.initialize()
         
         assert result is False
     
-    @patch('main.VideoScanner')
-    def test_initialize_exception(self, mock_video_scanner, test_config):
+    def test_initialize_exception(self, system, main_mocks):
         """Test inicialización con excepción."""
-        mock_video_scanner.side_effect = Exception("Test error")
+        main_mocks.scanner.side_effect = Exception("Test error")
         
-        system = SignageSystem(test_config)
         result = system.initialize()
         
         assert result is False
     
-    def test_start_already_running(self, test_config):
+    def test_start_already_running(self, system):
         """Test start cuando el sistema ya está ejecutándose."""
-        system = SignageSystem(test_config)
         system._running = True
         
         result = system.start()
@@ -95,34 +100,30 @@ class TestSignageSystem:
         assert result is True
     
     @patch('main.SignageSystem.initialize')
-    def test_start_initialization_fails(self, mock_initialize, test_config):
+    def test_start_initialization_fails(self, mock_initialize, system):
         """Test start cuando la inicialización falla."""
         mock_initialize.return_value = False
         
-        system = SignageSystem(test_config)
         result = system.start()
         
         assert result is False
         assert system._running is False
     
     @patch('main.SignageSystem.initialize')
-    @patch('threading.Thread')
-    def test_start_success(self, mock_thread, mock_initialize, test_config):
+    @patch('threading.Thread', FakeThread)
+    def test_start_success(self, mock_initialize, system):
         """Test start exitoso."""
         mock_initialize.return_value = True
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
         
-        system = SignageSystem(test_config)
         result = system.start()
         
         assert result is True
         assert system._running is True
-        mock_thread_instance.start.assert_called_once()
+        assert system._main_thread.started
+        assert system._main_thread.target == system._main_loop
     
-    def test_stop_not_running(self, test_config):
+    def test_stop_not_running(self, system):
         """Test stop cuando el sistema no está ejecutándose."""
-        system = SignageSystem(test_config)
         system._running = False
         
         # No debería hacer nada
@@ -131,48 +132,77 @@ class TestSignageSystem:
         assert system._running is False
     
     @patch('main.SignageSystem._cleanup')
-    def test_stop_running(self, mock_cleanup, test_config):
+    def test_stop_running(self, mock_cleanup, system):
         """Test stop cuando el sistema está ejecutándose."""
-        system = SignageSystem(test_config)
         system._running = True
         
-        # Mock del thread
-        mock_thread = Mock()
-        mock_thread.is_alive.return_value = False
-        system._main_thread = mock_thread
+        # Hilo principal simulado aún en ejecución
+        system._main_thread = FakeThread()
+        system._main_thread.alive = True
         
         system.stop()
         
         assert system._running is False
         assert system._shutdown_event.is_set()
+        assert system._main_thread.join_timeout == 10
         mock_cleanup.assert_called_once()
     
     def test_wait_or_shutdown_timeout(self, test_config):
         """Test _wait_or_shutdown con timeout."""
-        system = SignageSystem(test_config)
+        wait = Mock(return_value=False)
+        system = SignageSystem(test_config, wait=wait)
         
-        start_time = time.time()
         result = system._wait_or_shutdown(0.1)
-        end_time = time.time()
         
         assert result is True  # Completó la espera
-        assert (end_time - start_time) >= 0.1
+        wait.assert_called_once_with(0.1)
     
     def test_wait_or_shutdown_shutdown_signal(self, test_config):
         """Test _wait_or_shutdown con señal de parada."""
-        system = SignageSystem(test_config)
-        system._shutdown_event.set()
+        wait = Mock(return_value=True)
+        system = SignageSystem(test_config, wait=wait)
         
-        start_time = time.time()
         result = system._wait_or_shutdown(1.0)
-        end_time = time.time()
         
         assert result is False  # Se señaló parada
-        assert (end_time - start_time) < 0.5  # Terminó antes del timeout
+        wait.assert_called_once_with(1.0)
     
-    def test_handle_playback_error(self, test_config):
+    def test_wait_or_shutdown_defaults_to_shutdown_event(self, system):
+        """Test que por defecto la espera se interrumpe con el evento de parada."""
+        system._shutdown_event.set()
+        
+        assert system._wait == system._shutdown_event.wait
+        assert system._wait_or_shutdown(60) is False
+    
+    def test_wait_for_video_end_wakes_on_callback(self, system, mock_video_player):
+        """Test que el fin de video notificado por VLC despierta la espera."""
+        system.video_player = mock_video_player
+        system._running = True
+        mock_video_player.is_playing.return_value = True
+        
+        threading.Timer(0.05, system._on_video_end).start()
+        
+        start_time = time.time()
+        system._wait_for_video_end()
+        
+        assert (time.time() - start_time) < system.VIDEO_END_POLL_INTERVAL
+        assert not system._video_end.is_set()
+        mock_video_player.is_playing.assert_not_called()
+    
+    def test_wait_for_video_end_polls_player_as_fallback(self, system, mock_video_player):
+        """Test que sin evento se consulta el estado de VLC como respaldo."""
+        system.video_player = mock_video_player
+        system._running = True
+        system.VIDEO_END_POLL_INTERVAL = 0.01
+        mock_video_player.is_playing.side_effect = iter((True, False))
+        
+        system._wait_for_video_end()
+        
+        assert mock_video_player.is_playing.call_count == 2
+    
+    def test_handle_playback_error(self, test_config, fake_clock):
         """Test manejo de errores de reproducción."""
-        system = SignageSystem(test_config)
+        system = SignageSystem(test_config, wait=fake_clock.wait)
         initial_error_count = system._error_count
         initial_consecutive_errors = system._consecutive_errors
         
@@ -180,11 +210,12 @@ class TestSignageSystem:
         
         assert system._error_count == initial_error_count + 1
         assert system._consecutive_errors == initial_consecutive_errors + 1
+        assert fake_clock.waits == [test_config.retry_delay]
     
     @patch('main.SignageSystem._refresh_playlist')
-    def test_handle_playback_error_max_retries(self, mock_refresh, test_config):
+    def test_handle_playback_error_max_retries(self, mock_refresh, test_config, fake_clock):
         """Test manejo de errores cuando se alcanzan los reintentos máximos."""
-        system = SignageSystem(test_config)
+        system = SignageSystem(test_config, wait=fake_clock.wait)
         system._consecutive_errors = test_config.max_retries - 1
         
         system._handle_playback_error()
@@ -192,40 +223,69 @@ class TestSignageSystem:
         mock_refresh.assert_called_once()
         assert system._consecutive_errors == 0
     
-    def test_on_video_end_callback(self, test_config):
+    def test_on_video_end_callback(self, system):
         """Test callback de fin de video."""
-        system = SignageSystem(test_config)
-        
         # No debería lanzar excepción
         system._on_video_end()
     
     @patch('main.SignageSystem._handle_playback_error')
-    def test_on_video_error_callback(self, mock_handle_error, test_config):
+    def test_on_video_error_callback(self, mock_handle_error, system):
         """Test callback de error de video."""
-        system = SignageSystem(test_config)
-        
         system._on_video_error()
         
         mock_handle_error.assert_called_once()
     
-    @patch('threading.Thread')
     @patch('main.SignageSystem._refresh_playlist')
-    def test_on_directory_change_callback(self, mock_refresh, mock_thread, test_config):
+    def test_on_directory_change_callback(self, mock_refresh, test_config, inline_executor):
         """Test callback de cambio de directorio."""
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-        
-        system = SignageSystem(test_config)
+        system = SignageSystem(test_config, executor=inline_executor)
         change_info = {'type': 'created', 'path': '/test/video.mp4'}
         
         system._on_directory_change(change_info)
         
-        mock_thread.assert_called_once()
-        mock_thread_instance.start.assert_called_once()
+        mock_refresh.assert_called_once()
+    
+    def test_on_directory_change_coalesces_refreshes(self, test_config):
+        """Test que varios cambios seguidos dejan una única actualización pendiente."""
+        executor = Mock()
+        system = SignageSystem(test_config, executor=executor)
+        
+        for _ in range(3):
+            system._on_directory_change({'type': 'created'})
+        
+        executor.submit.assert_called_once_with(system._run_pending_refresh)
+        
+        # Al ejecutarse la pendiente se admite una nueva
+        system._refresh_pending = False
+        system._on_directory_change({'type': 'created'})
+        
+        assert executor.submit.call_count == 2
     
-    def test_refresh_playlist_success(self, test_config, mock_playlist_manager):
+    def test_pending_refresh_skipped_after_shutdown(self, test_config, inline_executor):
+        """Test que una actualización pendiente no se ejecuta tras la parada."""
+        system = SignageSystem(test_config, executor=inline_executor)
+        system._shutdown_event.set()
+        
+        with patch.object(system, '_refresh_playlist') as mock_refresh:
+            system._on_directory_change({'type': 'created'})
+        
+        mock_refresh.assert_not_called()
+        assert system._refresh_pending is False
+    
+    def test_directory_change_uses_default_executor(self, system, mock_playlist_manager):
+        """Test que el ejecutor por defecto actualiza la playlist en segundo plano."""
+        system.playlist_manager = mock_playlist_manager
+        refreshed = threading.Event()
+        mock_playlist_manager.load_videos_from_directory.side_effect = lambda: refreshed.set()
+        
+        system._on_directory_change({'type': 'created'})
+        
+        assert refreshed.wait(timeout=1)
+        mock_playlist_manager.load_videos_from_directory.assert_called_once()
+        system._executor.shutdown(wait=True)
+    
+    def test_refresh_playlist_success(self, system, mock_playlist_manager):
         """Test actualización exitosa de playlist."""
-        system = SignageSystem(test_config)
         system.playlist_manager = mock_playlist_manager
         mock_playlist_manager.load_videos_from_directory.return_value = 5
         
@@ -233,18 +293,16 @@ class TestSignageSystem:
         
         mock_playlist_manager.load_videos_from_directory.assert_called_once()
     
-    def test_refresh_playlist_exception(self, test_config, mock_playlist_manager):
+    def test_refresh_playlist_exception(self, system, mock_playlist_manager):
         """Test actualización de playlist con excepción."""
-        system = SignageSystem(test_config)
         system.playlist_manager = mock_playlist_manager
         mock_playlist_manager.load_videos_from_directory.side_effect = Exception("Test error")
         
         # No debería lanzar excepción
         system._refresh_playlist()
     
-    def test_cleanup_success(self, test_config, mock_video_player, mock_video_scanner):
+    def test_cleanup_success(self, system, mock_video_player, mock_video_scanner):
         """Test limpieza exitosa de recursos."""
-        system = SignageSystem(test_config)
         system.video_player = mock_video_player
         system.video_scanner = mock_video_scanner
         
@@ -253,19 +311,32 @@ class TestSignageSystem:
         mock_video_player.cleanup.assert_called_once()
         mock_video_scanner.cleanup.assert_called_once()
     
-    def test_cleanup_with_exception(self, test_config, mock_video_player):
+    def test_cleanup_with_exception(self, system, mock_video_player):
         """Test limpieza con excepción."""
-        system = SignageSystem(test_config)
         system.video_player = mock_video_player
         mock_video_player.cleanup.side_effect = Exception("Cleanup error")
         
         # No debería lanzar excepción
         system._cleanup()
     
-    def test_get_system_status_minimal(self, test_config):
-        """Test obtener estado del sistema sin componentes."""
-        system = SignageSystem(test_config)
+    def test_cleanup_shuts_down_own_executor(self, system):
+        """Test que la limpieza apaga el ejecutor creado por el sistema."""
+        system._cleanup()
+        
+        with pytest.raises(RuntimeError):
+            system._executor.submit(lambda: None)
+    
+    def test_cleanup_keeps_injected_executor(self, test_config):
+        """Test que la limpieza no apaga un ejecutor inyectado."""
+        executor = Mock()
+        system = SignageSystem(test_config, executor=executor)
+        
+        system._cleanup()
         
+        executor.shutdown.assert_not_called()
+    
+    def test_get_system_status_minimal(self, system):
+        """Test obtener estado del sistema sin componentes."""
         status = system.get_system_status()
         
         assert 'running' in status
@@ -279,10 +350,9 @@ class TestSignageSystem:
         assert status['error_count'] == 0
         assert status['consecutive_errors'] == 0
     
-    def test_get_system_status_with_components(self, test_config, mock_video_player, 
+    def test_get_system_status_with_components(self, system, mock_video_player, 
                                              mock_playlist_manager, mock_video_scanner):
         """Test obtener estado del sistema con componentes."""
-        system = SignageSystem(test_config)
         system.video_player = mock_video_player
         system.playlist_manager = mock_playlist_manager
         system.video_scanner = mock_video_scanner
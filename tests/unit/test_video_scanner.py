@@ -1,11 +1,13 @@
 """Tests unitarios para VideoScanner."""
 
+import os
 import pytest
 import time
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, call, patch, MagicMock
 from pathlib import Path
 
-from video_scanner import VideoScanner, VideoFileHandler
+from logger import logger
+from video_scanner import VideoScanner, VideoFileHandler, WATCHED_EVENTS
 
 
 class TestVideoFileHandler:
@@ -18,9 +20,17 @@ class TestVideoFileHandler:
         
         handler = VideoFileHandler(supported_formats, callback)
         
-        assert handler.supported_formats == ['.mp4', '.avi', '.mkv']  # Convertidos a minúsculas
+        assert handler._is_video_file('/path/to/video.mkv') is True  # Sin distinguir mayúsculas
         assert handler.callback == callback
     
+    def test_init_with_compiled_pattern(self, test_config):
+        """Test que el handler reutiliza el patrón compilado de la configuración."""
+        pattern = test_config.supported_formats_pattern
+        
+        handler = VideoFileHandler(pattern)
+        
+        assert handler._formats_pattern is pattern
+    
     def test_is_video_file_true(self):
         """Test identificación de archivo de video válido."""
         handler = VideoFileHandler(['.mp4', '.avi'])
@@ -34,6 +44,20 @@ class TestVideoFileHandler:
         
         assert handler._is_video_file('/path/to/document.txt') is False
         assert handler._is_video_file('/path/to/image.jpg') is False
+        assert handler._is_video_file('/path/to/.mp4') is False  # Archivo oculto
+    
+    def test_event_log_shows_basename(self):
+        """Test que el nombre del archivo se formatea al emitir el log."""
+        messages = []
+        handler = VideoFileHandler(['.mp4'])
+        sink_id = logger.add(messages.append, level="INFO", format="{message}")
+        try:
+            event = Mock(is_directory=False, src_path='/path/to/new_video.mp4')
+            handler.on_created(event)
+        finally:
+            logger.remove(sink_id)
+        
+        assert messages == ["Nuevo video detectado: new_video.mp4\n"]
     
     def test_on_created_video_file(self):
         """Test evento de creación de archivo de video."""
@@ -178,6 +202,16 @@ class TestVideoScanner:
         
         assert result is False
     
+    def test_validate_directory_permission_denied(self, test_config, video_dir):
+        """Test validación de directorio sin permiso de lectura."""
+        scanner = VideoScanner(test_config)
+        
+        with patch('video_scanner.os.access', return_value=False) as mock_access:
+            result = scanner.validate_directory()
+        
+        assert result is False
+        mock_access.assert_called_once_with(test_config.video_dir, os.R_OK | os.X_OK)
+    
     def test_scan_videos_success(self, test_config, sample_video_files):
         """Test escaneo exitoso de videos."""
         scanner = VideoScanner(test_config)
@@ -192,6 +226,17 @@ class TestVideoScanner:
         assert len(scanner._cached_videos) == len(sample_video_files)
         assert scanner._last_scan_time is not None
     
+    def test_iter_videos(self, test_config, sample_video_files):
+        """Test generación perezosa de videos sin tocar el caché."""
+        scanner = VideoScanner(test_config)
+        
+        result = scanner.iter_videos()
+        
+        assert not isinstance(result, list)
+        assert sorted(result) == sorted(str(f) for f in sample_video_files)
+        assert scanner._cached_videos == set()
+        assert scanner._last_scan_time is None
+    
     def test_scan_videos_custom_directory(self, test_config, temp_dir):
         """Test escaneo de directorio personalizado."""
         # Crear directorio personalizado con videos
@@ -208,6 +253,23 @@ class TestVideoScanner:
         assert len(result) == 1
         assert str(video_file) in result
     
+    def test_scan_videos_skips_empty_files_and_directories(self, test_config, temp_dir):
+        """Test que se ignoran archivos vacíos y directorios con extensión de video."""
+        custom_dir = temp_dir / "mixed_videos"
+        custom_dir.mkdir()
+        
+        video_file = custom_dir / "video.mp4"
+        video_file.write_text("fake video")
+        (custom_dir / "empty.mp4").touch()
+        (custom_dir / "folder.avi").mkdir()
+        (custom_dir / "notes.txt").write_text("not a video")
+        
+        scanner = VideoScanner(test_config)
+        
+        result = scanner.scan_videos(str(custom_dir))
+        
+        assert result == [str(video_file)]
+    
     def test_scan_videos_no_videos(self, test_config):
         """Test escaneo sin videos."""
         scanner = VideoScanner(test_config)
@@ -251,8 +313,25 @@ class TestVideoScanner:
         assert scanner._observer == mock_observer
         
         mock_observer.schedule.assert_called_once()
+        assert mock_observer.schedule.call_args.kwargs['event_filter'] == WATCHED_EVENTS
         mock_observer.start.assert_called_once()
     
+    @patch('video_scanner.Observer')
+    @patch('video_scanner.PollingObserver')
+    def test_start_monitoring_polling(self, mock_polling_class, mock_observer_class, test_config):
+        """Test monitoreo por sondeo para sistemas de archivos de red."""
+        test_config.polling_observer = True
+        test_config.polling_interval = 10
+        scanner = VideoScanner(test_config)
+        
+        result = scanner.start_monitoring()
+        
+        assert result is True
+        mock_polling_class.assert_called_once_with(timeout=10)
+        mock_observer_class.assert_not_called()
+        assert scanner._observer == mock_polling_class.return_value
+        mock_polling_class.return_value.start.assert_called_once()
+    
     @patch('video_scanner.Observer')
     def test_start_monitoring_already_monitoring(self, mock_observer_class, test_config):
         """Test inicio de monitoreo cuando ya está monitoreando."""
@@ -264,6 +343,17 @@ class TestVideoScanner:
         assert result is True
         mock_observer_class.assert_not_called()
     
+    def test_start_monitoring_missing_directory(self, test_config):
+        """Test inicio de monitoreo sobre un directorio inexistente."""
+        test_config.video_dir = Path('/nonexistent/directory')
+        scanner = VideoScanner(test_config)
+        
+        result = scanner.start_monitoring()
+        
+        assert result is False
+        assert scanner._is_monitoring is False
+        assert scanner._observer is None
+    
     @patch('video_scanner.Observer')
     def test_start_monitoring_exception(self, mock_observer_class, test_config):
         """Test inicio de monitoreo con excepción."""
@@ -315,32 +405,129 @@ class TestVideoScanner:
         assert result is False
         assert scanner._is_monitoring is True  # No cambió por la excepción
     
-    def test_handle_file_change_created(self, test_config):
+    def test_handle_file_change_created(self, test_config, video_dir):
         """Test manejo de cambio de archivo - creado."""
+        new_video = video_dir / "new_video.mp4"
+        new_video.write_bytes(b"fake video content")
+        callback = Mock()
+        scanner = VideoScanner(test_config)
+        scanner._on_change_callback = callback
+        
+        with patch.object(scanner, 'scan_videos') as mock_scan:
+            scanner._handle_file_change('created', str(new_video))
+        
+        # El caché se actualiza con la ruta del evento, sin re-escanear
+        mock_scan.assert_not_called()
+        assert scanner._cached_videos == {str(new_video)}
+        callback.assert_called_once_with({
+            'event_type': 'created',
+            'added': [str(new_video)],
+            'removed': [],
+            'total_videos': 1
+        })
+    
+    def test_handle_file_change_created_empty_file(self, test_config, video_dir):
+        """Test que un archivo creado pero aún vacío no se añade al caché."""
+        empty_video = video_dir / "copying.mp4"
+        empty_video.touch()
         callback = Mock()
         scanner = VideoScanner(test_config)
+        scanner._on_change_callback = callback
         
-        scanner._handle_file_change('created', '/path/to/new_video.mp4')
+        scanner._handle_file_change('created', str(empty_video))
         
-        # Debería actualizar el caché interno
-        # (implementación específica depende del código real)
+        assert scanner._cached_videos == set()
+        callback.assert_not_called()
     
     def test_handle_file_change_deleted(self, test_config):
         """Test manejo de cambio de archivo - eliminado."""
         scanner = VideoScanner(test_config)
         scanner._cached_videos.add('/path/to/video.mp4')
         
-        scanner._handle_file_change('deleted', '/path/to/video.mp4')
+        with patch.object(scanner, 'scan_videos') as mock_scan:
+            scanner._handle_file_change('deleted', '/path/to/video.mp4')
         
         # El video debería ser removido del caché
+        mock_scan.assert_not_called()
         assert '/path/to/video.mp4' not in scanner._cached_videos
     
+    def test_handle_file_change_unknown_event_rescans(self, test_config):
+        """Test que un tipo de evento desconocido fuerza un escaneo completo."""
+        callback = Mock()
+        scanner = VideoScanner(test_config)
+        scanner._on_change_callback = callback
+        scanner._cached_videos.add('/path/to/old.mp4')
+        
+        with patch.object(scanner, 'scan_videos', return_value=['/path/to/new.mp4']):
+            scanner._handle_file_change('invalid_event', '/path/to/video.mp4')
+        
+        assert scanner._cached_videos == {'/path/to/new.mp4'}
+        callback.assert_called_once_with({
+            'event_type': 'invalid_event',
+            'added': ['/path/to/new.mp4'],
+            'removed': ['/path/to/old.mp4'],
+            'total_videos': 1
+        })
+    
     def test_handle_file_change_exception(self, test_config):
         """Test manejo de cambio con excepción."""
         scanner = VideoScanner(test_config)
+        scanner._on_change_callback = Mock(side_effect=Exception("Callback error"))
+        scanner._cached_videos.add('/path/to/video.mp4')
         
         # No debería lanzar excepción
-        scanner._handle_file_change('invalid_event', '/path/to/video.mp4')
+        scanner._handle_file_change('deleted', '/path/to/video.mp4')
+    
+    @patch('video_scanner.threading.Timer')
+    def test_queue_file_change_batches_burst(self, mock_timer_class, test_config):
+        """Test que una ráfaga de eventos programa un único procesamiento."""
+        scanner = VideoScanner(test_config)
+        
+        scanner._queue_file_change('created', '/videos/tmp.mp4')
+        scanner._queue_file_change('created', '/videos/a.mp4')
+        scanner._queue_file_change('deleted', '/videos/tmp.mp4')
+        
+        mock_timer_class.assert_called_once_with(
+            VideoScanner.CHANGE_DEBOUNCE_INTERVAL, scanner._flush_file_changes
+        )
+        mock_timer_class.return_value.start.assert_called_once()
+        # Solo cuenta el último evento de cada ruta
+        assert scanner._pending_changes == {
+            '/videos/tmp.mp4': 'deleted',
+            '/videos/a.mp4': 'created',
+        }
+    
+    @patch('video_scanner.threading.Timer')
+    def test_flush_file_changes(self, mock_timer_class, test_config):
+        """Test que el procesamiento aplica los cambios acumulados una vez."""
+        scanner = VideoScanner(test_config)
+        scanner._queue_file_change('created', '/videos/a.mp4')
+        scanner._queue_file_change('created', '/videos/b.mp4')
+        scanner._queue_file_change('deleted', '/videos/old.mp4')
+        
+        with patch.object(scanner, '_handle_file_change') as mock_handle:
+            scanner._flush_file_changes()
+        
+        assert mock_handle.call_args_list == [
+            call('deleted', '/videos/old.mp4'),
+            call('created', '/videos/a.mp4', '/videos/b.mp4'),
+        ]
+        assert scanner._pending_changes == {}
+        assert scanner._flush_timer is None
+    
+    @patch('video_scanner.threading.Timer')
+    def test_stop_monitoring_cancels_pending_changes(self, mock_timer_class, test_config):
+        """Test que detener el monitoreo descarta los cambios pendientes."""
+        scanner = VideoScanner(test_config)
+        scanner._is_monitoring = True
+        scanner._observer = Mock()
+        scanner._queue_file_change('created', '/videos/a.mp4')
+        
+        scanner.stop_monitoring()
+        
+        mock_timer_class.return_value.cancel.assert_called_once()
+        assert scanner._pending_changes == {}
+        assert scanner._flush_timer is None
     
     def test_is_monitoring_true(self, test_config):
         """Test verificación de estado de monitoreo - activo."""
@@ -389,6 +576,21 @@ class TestVideoScanner:
         assert result['path'] == str(test_config.video_dir)
         assert result['video_count'] == len(sample_video_files)
         assert result['is_monitoring'] is False
+        assert result['exists'] is True
+        # Cuenta todos los archivos regulares, no solo los videos
+        assert result['directory_size'] == sum(
+            f.stat().st_size for f in test_config.video_dir.iterdir() if f.is_file()
+        )
+    
+    def test_context_manager_cleans_up(self, test_config):
+        """Test que salir del bloque with libera los recursos."""
+        with VideoScanner(test_config) as scanner:
+            scanner._is_monitoring = True
+            scanner._observer = Mock()
+            scanner._cached_videos.add('/path/to/video.mp4')
+        
+        assert scanner._is_monitoring is False
+        assert scanner._cached_videos == set()
     
     def test_cleanup_not_monitoring(self, test_config):
         """Test limpieza cuando no está monitoreando."""
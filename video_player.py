@@ -5,13 +5,12 @@ con el sistema de cartelería digital, proporcionando una interfaz
 simplificada para la reproducción de videos.
 """
 
+import os
 import vlc
-import time
 import threading
 from typing import Optional, Callable
-from pathlib import Path
 
-from logger import app_logger
+from logger import logger
 from config import VLCConfig, DEFAULT_VLC_CONFIG
 
 
@@ -28,6 +27,9 @@ class VideoPlayer:
     en Raspberry Pi 3 A+.
     """
     
+    # Tiempo máximo de espera al evento de VLC que confirma el inicio
+    PLAYBACK_START_TIMEOUT = 1.0
+    
     def __init__(self, config: Optional[VLCConfig] = None):
         """Inicializa el reproductor con la configuración especificada.
         
@@ -35,7 +37,7 @@ class VideoPlayer:
             config: Configuración de VLC. Si es None, usa la configuración por defecto.
         """
         self.config = config or DEFAULT_VLC_CONFIG
-        self.logger = app_logger.get_logger()
+        self.logger = logger
         
         # Estado del reproductor
         self._instance: Optional[vlc.Instance] = None
@@ -43,6 +45,7 @@ class VideoPlayer:
         self._current_media: Optional[vlc.Media] = None
         self._is_playing = False
         self._current_video_path: Optional[str] = None
+        self._playing_event = threading.Event()
         
         # Callbacks
         self._on_end_callback: Optional[Callable] = None
@@ -105,34 +108,35 @@ class VideoPlayer:
     
     def _on_media_end(self, event) -> None:
         """Callback llamado cuando termina la reproducción de un video."""
-        self.logger.info(f"Reproducción terminada: {self._current_video_path}")
+        self.logger.info("Reproducción terminada: {}", self._current_video_path)
         self._is_playing = False
         
         if self._on_end_callback:
             try:
                 self._on_end_callback()
             except Exception as e:
-                self.logger.error(f"Error en callback de fin de reproducción: {e}")
+                self.logger.error("Error en callback de fin de reproducción: {}", e)
     
     def _on_media_error(self, event) -> None:
         """Callback llamado cuando ocurre un error en la reproducción."""
-        self.logger.error(f"Error en reproducción: {self._current_video_path}")
+        self.logger.error("Error en reproducción: {}", self._current_video_path)
         self._is_playing = False
         
         if self._on_error_callback:
             try:
                 self._on_error_callback()
             except Exception as e:
-                self.logger.error(f"Error en callback de error: {e}")
+                self.logger.error("Error en callback de error: {}", e)
     
     def _on_media_playing(self, event) -> None:
         """Callback llamado cuando inicia la reproducción."""
-        self.logger.info(f"Reproducción iniciada: {self._current_video_path}")
+        self.logger.info("Reproducción iniciada: {}", self._current_video_path)
         self._is_playing = True
+        self._playing_event.set()
     
     def _on_media_stopped(self, event) -> None:
         """Callback llamado cuando se detiene la reproducción."""
-        self.logger.info(f"Reproducción detenida: {self._current_video_path}")
+        self.logger.info("Reproducción detenida: {}", self._current_video_path)
         self._is_playing = False
     
     def play_video(self, video_path: str) -> bool:
@@ -148,9 +152,9 @@ class VideoPlayer:
             self.logger.error("Reproductor no inicializado")
             return False
         
-        video_file = Path(video_path)
-        if not video_file.exists():
-            self.logger.error(f"Archivo de video no encontrado: {video_path}")
+        # Comprobar que VLC podrá leer el archivo, no solo que existe
+        if not os.access(video_path, os.R_OK):
+            self.logger.error("Archivo de video no encontrado o sin permiso de lectura: {}", video_path)
             return False
         
         try:
@@ -159,30 +163,31 @@ class VideoPlayer:
                 self.stop()
             
             # Crear nuevo media
-            self._current_media = self._instance.media_new(str(video_file))
+            self._current_media = self._instance.media_new(video_path)
             self._player.set_media(self._current_media)
             self._current_video_path = video_path
             
             # Iniciar reproducción
+            self._playing_event.clear()
             result = self._player.play()
             
             if result == 0:  # 0 indica éxito en VLC
-                # Esperar un momento para que inicie la reproducción
-                time.sleep(0.5)
+                # Esperar a que VLC confirme el inicio de la reproducción
+                if not self._playing_event.wait(self.PLAYBACK_START_TIMEOUT):
+                    self.logger.warning("VLC no confirmó el inicio de la reproducción: {}", video_path)
                 
                 # Forzar pantalla completa
                 if self.config.fullscreen:
                     self._player.set_fullscreen(True)
                 
-                self.logger.info(f"Reproducción iniciada exitosamente: {video_path}")
+                self.logger.info("Reproducción iniciada exitosamente: {}", video_path)
                 return True
             else:
-                self.logger.error(f"Error al iniciar reproducción: código {result}")
+                self.logger.error("Error al iniciar reproducción: código {}", result)
                 return False
                 
         except Exception as e:
-            error_msg = f"Error al reproducir video {video_path}: {str(e)}"
-            self.logger.error(error_msg)
+            self.logger.error("Error al reproducir video {}: {}", video_path, e)
             return False
     
     def stop(self) -> bool:
@@ -203,7 +208,7 @@ class VideoPlayer:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error al detener reproducción: {str(e)}")
+            self.logger.error("Error al detener reproducción: {}", e)
             return False
     
     def pause(self) -> bool:
@@ -221,7 +226,7 @@ class VideoPlayer:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error al pausar reproducción: {str(e)}")
+            self.logger.error("Error al pausar reproducción: {}", e)
             return False
     
     def resume(self) -> bool:
@@ -239,7 +244,7 @@ class VideoPlayer:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error al reanudar reproducción: {str(e)}")
+            self.logger.error("Error al reanudar reproducción: {}", e)
             return False
     
     def is_playing(self) -> bool:
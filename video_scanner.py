@@ -4,14 +4,32 @@ Este módulo implementa el patrón Observer para monitorear cambios
 en el directorio de videos y actualizar automáticamente la playlist.
 """
 
+import os
+import re
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional, Callable, Set
+from stat import S_ISDIR, S_ISREG
+from typing import Dict, Iterable, Iterator, List, Optional, Callable, Pattern, Set, Union
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileSystemEvent
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import (
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileMovedEvent,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 
-from logger import app_logger
-from config import SystemConfig, DEFAULT_SYSTEM_CONFIG
+from logger import logger
+from config import SystemConfig, DEFAULT_SYSTEM_CONFIG, compile_formats_pattern
+
+# Eventos que atiende VideoFileHandler. Con watchdog >= 4 el backend inotify
+# construye su máscara a partir de este filtro, de modo que los accesos de
+# VLC al video en reproducción (IN_OPEN, IN_ACCESS...) no despiertan al
+# observer.
+WATCHED_EVENTS = [FileCreatedEvent, FileDeletedEvent, FileMovedEvent]
 
 
 class VideoFileHandler(FileSystemEventHandler):
@@ -21,17 +39,25 @@ class VideoFileHandler(FileSystemEventHandler):
     en el directorio de videos y notificar al sistema principal.
     """
     
-    def __init__(self, supported_formats: List[str], callback: Optional[Callable] = None):
+    def __init__(
+        self,
+        supported_formats: Union[Iterable[str], Pattern[str]],
+        callback: Optional[Callable] = None
+    ):
         """Inicializa el manejador de eventos.
         
         Args:
-            supported_formats: Lista de extensiones de video soportadas
+            supported_formats: Extensiones de video soportadas o el patrón
+                ya compilado con compile_formats_pattern
             callback: Función a llamar cuando se detecten cambios
         """
         super().__init__()
-        self.supported_formats = [fmt.lower() for fmt in supported_formats]
+        if isinstance(supported_formats, re.Pattern):
+            self._formats_pattern = supported_formats
+        else:
+            self._formats_pattern = compile_formats_pattern(supported_formats)
         self.callback = callback
-        self.logger = app_logger.get_logger()
+        self.logger = logger
     
     def _is_video_file(self, file_path: str) -> bool:
         """Verifica si un archivo es un video soportado.
@@ -42,7 +68,7 @@ class VideoFileHandler(FileSystemEventHandler):
         Returns:
             True si es un archivo de video soportado
         """
-        return Path(file_path).suffix.lower() in self.supported_formats
+        return self._formats_pattern.search(file_path) is not None
     
     def on_created(self, event: FileSystemEvent) -> None:
         """Maneja eventos de creación de archivos.
@@ -51,7 +77,7 @@ class VideoFileHandler(FileSystemEventHandler):
             event: Evento del sistema de archivos
         """
         if not event.is_directory and self._is_video_file(event.src_path):
-            self.logger.info(f"Nuevo video detectado: {Path(event.src_path).name}")
+            self.logger.opt(lazy=True).info("Nuevo video detectado: {}", lambda: os.path.basename(event.src_path))
             if self.callback:
                 self.callback('created', event.src_path)
     
@@ -62,7 +88,7 @@ class VideoFileHandler(FileSystemEventHandler):
             event: Evento del sistema de archivos
         """
         if not event.is_directory and self._is_video_file(event.src_path):
-            self.logger.info(f"Video eliminado: {Path(event.src_path).name}")
+            self.logger.opt(lazy=True).info("Video eliminado: {}", lambda: os.path.basename(event.src_path))
             if self.callback:
                 self.callback('deleted', event.src_path)
     
@@ -80,18 +106,18 @@ class VideoFileHandler(FileSystemEventHandler):
                 
                 if src_is_video and dest_is_video:
                     # Renombrado de video - tratado como eliminación + creación
-                    self.logger.info(f"Video renombrado: {Path(event.src_path).name} -> {Path(event.dest_path).name}")
+                    self.logger.opt(lazy=True).info("Video renombrado: {} -> {}", lambda: os.path.basename(event.src_path), lambda: os.path.basename(event.dest_path))
                     if self.callback:
                         self.callback('deleted', event.src_path)
                         self.callback('created', event.dest_path)
                 elif src_is_video and not dest_is_video:
                     # Video movido fuera o cambio de extensión
-                    self.logger.info(f"Video removido: {Path(event.src_path).name}")
+                    self.logger.opt(lazy=True).info("Video removido: {}", lambda: os.path.basename(event.src_path))
                     if self.callback:
                         self.callback('deleted', event.src_path)
                 elif not src_is_video and dest_is_video:
                     # Archivo convertido a video
-                    self.logger.info(f"Nuevo video: {Path(event.dest_path).name}")
+                    self.logger.opt(lazy=True).info("Nuevo video: {}", lambda: os.path.basename(event.dest_path))
                     if self.callback:
                         self.callback('created', event.dest_path)
 
@@ -103,6 +129,16 @@ class VideoScanner:
     en el directorio de videos y proporcionar funcionalidades de escaneo.
     """
     
+    # Ventana en segundos para agrupar los eventos de una misma ráfaga
+    # (copias con rsync, guardados atómicos de editores...)
+    CHANGE_DEBOUNCE_INTERVAL = 0.2
+    
+    # Actualización del caché para cada tipo de evento conocido
+    _CACHE_UPDATES = {
+        'created': set.union,
+        'deleted': set.difference,
+    }
+    
     def __init__(self, config: Optional[SystemConfig] = None):
         """Inicializa el escáner con la configuración especificada.
         
@@ -110,19 +146,74 @@ class VideoScanner:
             config: Configuración del sistema. Si es None, usa la configuración por defecto.
         """
         self.config = config or DEFAULT_SYSTEM_CONFIG
-        self.logger = app_logger.get_logger()
+        self.logger = logger
         
         # Estado del escáner
-        self._observer: Optional[Observer] = None
+        self._observer: Optional[BaseObserver] = None
         self._is_monitoring = False
         self._last_scan_time: Optional[float] = None
         self._cached_videos: Set[str] = set()
         
+        # Cambios pendientes de procesar: ruta -> último tipo de evento
+        self._pending_changes: Dict[str, str] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        
         # Callbacks
         self._on_change_callback: Optional[Callable] = None
         
         self.logger.info(f"VideoScanner inicializado para directorio: {self.config.video_dir}")
     
+    def iter_videos(self, directory_path: Optional[str] = None) -> Iterator[str]:
+        """Genera las rutas de los videos del directorio a medida que se encuentran.
+        
+        No ordena los resultados ni actualiza el caché; para eso está
+        scan_videos().
+        
+        Args:
+            directory_path: Ruta del directorio. Si es None, usa el directorio configurado.
+            
+        Yields:
+            Ruta completa de cada archivo de video no vacío, en el orden del directorio
+        """
+        if directory_path is None:
+            directory_path = str(self.config.video_dir)
+        
+        # Mismo patrón compilado que usa PlaylistManager al cargar videos
+        is_supported = self.config.supported_formats_pattern.search
+        
+        # Buscar archivos de video: primero la extensión, luego el tipo
+        # (cacheado por scandir) y solo al final el stat
+        with os.scandir(directory_path) as it:
+            for entry in it:
+                if not is_supported(entry.name):
+                    continue
+                
+                # Verificar que el archivo sea accesible
+                try:
+                    if entry.is_file() and entry.stat().st_size > 0:  # Archivo no vacío
+                        yield entry.path
+                except OSError as e:
+                    self.logger.warning(f"No se puede acceder al archivo {entry.path}: {e}")
+    
+    @staticmethod
+    def _is_playable_file(file_path: str) -> bool:
+        """Verifica que la ruta sea un archivo regular no vacío.
+        
+        Es el mismo criterio que aplica iter_videos(), con un único stat.
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            True si el archivo existe, es regular y tiene contenido
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        return S_ISREG(st.st_mode) and st.st_size > 0
+    
     def scan_videos(self, directory_path: Optional[str] = None) -> List[str]:
         """Escanea el directorio y retorna lista de archivos de video.
         
@@ -147,17 +238,7 @@ class VideoScanner:
             return video_files
         
         try:
-            # Buscar archivos de video
-            for file_path in video_dir.iterdir():
-                if (file_path.is_file() and 
-                    file_path.suffix.lower() in self.config.supported_formats):
-                    
-                    # Verificar que el archivo sea accesible
-                    try:
-                        if file_path.stat().st_size > 0:  # Archivo no vacío
-                            video_files.append(str(file_path))
-                    except OSError as e:
-                        self.logger.warning(f"No se puede acceder al archivo {file_path}: {e}")
+            video_files.extend(self.iter_videos(directory_path))
             
             # Ordenar archivos por nombre
             video_files.sort()
@@ -206,10 +287,6 @@ class VideoScanner:
             self.logger.warning("El monitoreo ya está activo")
             return True
         
-        if not self.config.video_dir.exists():
-            self.logger.error(f"No se puede monitorear directorio inexistente: {self.config.video_dir}")
-            return False
-        
         try:
             # Configurar callback
             if callback:
@@ -217,25 +294,35 @@ class VideoScanner:
             
             # Crear manejador de eventos
             event_handler = VideoFileHandler(
-                supported_formats=self.config.supported_formats,
-                callback=self._handle_file_change
+                supported_formats=self.config.supported_formats_pattern,
+                callback=self._queue_file_change
             )
             
-            # Crear y configurar observer
-            self._observer = Observer()
-            self._observer.schedule(
+            # Crear y configurar observer; en sistemas de archivos de red
+            # inotify no ve las escrituras remotas y hay que sondear
+            if self.config.polling_observer:
+                observer = PollingObserver(timeout=self.config.polling_interval)
+            else:
+                observer = Observer()
+            observer.schedule(
                 event_handler,
                 str(self.config.video_dir),
-                recursive=False
+                recursive=False,
+                event_filter=WATCHED_EVENTS
             )
             
-            # Iniciar monitoreo
-            self._observer.start()
+            # Iniciar monitoreo; si el directorio no existe, start() lo
+            # detecta al crear la vigilancia
+            observer.start()
+            self._observer = observer
             self._is_monitoring = True
             
             self.logger.info(f"Monitoreo iniciado para: {self.config.video_dir}")
             return True
             
+        except FileNotFoundError:
+            self.logger.error(f"No se puede monitorear directorio inexistente: {self.config.video_dir}")
+            return False
         except Exception as e:
             self.logger.error(f"Error al iniciar monitoreo: {e}")
             return False
@@ -249,6 +336,8 @@ class VideoScanner:
         if not self._is_monitoring:
             return True
         
+        self._cancel_pending_changes()
+        
         try:
             if self._observer:
                 self._observer.stop()
@@ -263,19 +352,70 @@ class VideoScanner:
             self.logger.error(f"Error al detener monitoreo: {e}")
             return False
     
+    def _queue_file_change(self, event_type: str, file_path: str) -> None:
+        """Acumula un cambio de archivo para procesarlo al cerrar la ventana.
+        
+        El primer evento de una ráfaga programa el procesamiento dentro de
+        CHANGE_DEBOUNCE_INTERVAL segundos; si una misma ruta cambia varias
+        veces dentro de la ventana, solo cuenta su último evento.
+        
+        Args:
+            event_type: Tipo de evento ('created' o 'deleted')
+            file_path: Ruta del archivo afectado
+        """
+        with self._pending_lock:
+            self._pending_changes[file_path] = event_type
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self.CHANGE_DEBOUNCE_INTERVAL, self._flush_file_changes
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _flush_file_changes(self) -> None:
+        """Procesa los cambios acumulados durante la ventana de agrupación."""
+        with self._pending_lock:
+            changes = self._pending_changes
+            self._pending_changes = {}
+            self._flush_timer = None
+        
+        for event_type in ('deleted', 'created'):
+            paths = [path for path, kind in changes.items() if kind == event_type]
+            if paths:
+                self._handle_file_change(event_type, *paths)
+    
+    def _cancel_pending_changes(self) -> None:
+        """Descarta los cambios acumulados que aún no se han procesado."""
+        with self._pending_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending_changes.clear()
+    
     def _handle_file_change(self, event_type: str, *args) -> None:
         """Maneja los cambios detectados en el directorio.
         
+        Los eventos 'created' y 'deleted' actualizan el caché con las rutas
+        recibidas sin volver a recorrer el directorio; de las creadas solo
+        se añaden las que iter_videos() aceptaría (archivos regulares no
+        vacíos). Cualquier otro tipo de evento fuerza un escaneo completo.
+        
         Args:
             event_type: Tipo de evento ('created', 'deleted', 'moved')
-            *args: Argumentos adicionales del evento
+            *args: Rutas afectadas por el evento
         """
         try:
-            # Esperar un momento para que el archivo se estabilice
-            time.sleep(0.5)
+            if event_type == 'created':
+                # Un archivo recién creado puede seguir vacío mientras se copia
+                args = tuple(filter(self._is_playable_file, args))
             
-            # Re-escanear directorio
-            current_videos = set(self.scan_videos())
+            update_cache = self._CACHE_UPDATES.get(event_type)
+            if update_cache:
+                current_videos = update_cache(self._cached_videos, args)
+            else:
+                previous_videos = self._cached_videos
+                current_videos = set(self.scan_videos())
+                self._cached_videos = previous_videos
             
             # Detectar cambios
             added_videos = current_videos - self._cached_videos
@@ -320,10 +460,15 @@ class VideoScanner:
         """
         video_dir = self.config.video_dir
         
+        try:
+            dir_stat = os.stat(video_dir)
+        except OSError:
+            dir_stat = None
+        
         info = {
             'path': str(video_dir),  # Cambiar 'directory_path' por 'path'
             'directory_path': str(video_dir),
-            'exists': video_dir.exists(),
+            'exists': dir_stat is not None,
             'is_monitoring': self._is_monitoring,
             'video_count': len(self._cached_videos),  # Cambiar 'cached_video_count' por 'video_count'
             'last_scan_time': self._last_scan_time,
@@ -331,19 +476,42 @@ class VideoScanner:
             'cached_video_count': len(self._cached_videos)
         }
         
-        if video_dir.exists():
+        if dir_stat is not None:
             try:
-                stat = video_dir.stat()
                 info.update({
-                    'directory_size': sum(f.stat().st_size for f in video_dir.iterdir() if f.is_file()),
-                    'last_modified': stat.st_mtime,
-                    'permissions': oct(stat.st_mode)[-3:]
+                    'directory_size': self._directory_size(video_dir),
+                    'last_modified': dir_stat.st_mtime,
+                    'permissions': oct(dir_stat.st_mode)[-3:]
                 })
             except OSError:
                 pass
         
         return info
     
+    @staticmethod
+    def _directory_size(directory_path) -> int:
+        """Suma el tamaño de los archivos regulares de un directorio.
+        
+        El tipo de cada entrada sale del propio listado de scandir, así que
+        solo se hace un stat por archivo; las entradas que desaparecen o no
+        se pueden leer durante el recorrido se ignoran.
+        
+        Args:
+            directory_path: Ruta del directorio
+            
+        Returns:
+            Tamaño total en bytes
+        """
+        total = 0
+        with os.scandir(directory_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        total += entry.stat().st_size
+                except OSError:
+                    continue
+        return total
+    
     def validate_directory(self) -> bool:
         """Valida que el directorio de videos sea accesible.
         
@@ -352,24 +520,26 @@ class VideoScanner:
         """
         video_dir = self.config.video_dir
         
-        if not video_dir.exists():
+        # Un único stat para existencia y tipo
+        try:
+            st = os.stat(video_dir)
+        except FileNotFoundError:
             self.logger.error(f"Directorio no existe: {video_dir}")
             return False
+        except OSError as e:
+            self.logger.error(f"Error al validar directorio {video_dir}: {e}")
+            return False
         
-        if not video_dir.is_dir():
+        if not S_ISDIR(st.st_mode):
             self.logger.error(f"La ruta no es un directorio: {video_dir}")
             return False
         
-        try:
-            # Intentar listar el contenido
-            list(video_dir.iterdir())
-            return True
-        except PermissionError:
+        # Permisos de lectura y recorrido con una sola llamada, sin abrir el directorio
+        if not os.access(video_dir, os.R_OK | os.X_OK):
             self.logger.error(f"Sin permisos para acceder al directorio: {video_dir}")
             return False
-        except Exception as e:
-            self.logger.error(f"Error al validar directorio {video_dir}: {e}")
-            return False
+        
+        return True
     
     def cleanup(self) -> None:
         """Limpia los recursos del escáner."""
@@ -377,6 +547,10 @@ class VideoScanner:
         self._cached_videos.clear()
         self.logger.info("Recursos del escáner liberados")
     
-    def __del__(self):
-        """Destructor que asegura la limpieza de recursos."""
+    def __enter__(self) -> 'VideoScanner':
+        """Permite usar el escáner como gestor de contexto."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Libera los recursos al salir del bloque ``with``."""
         self.cleanup()
\ No newline at end of file